@@ -11,11 +11,122 @@ Typical usage with your batch runner:
 Direct usage:
   python3 convert_capsym_log.py GND.log --scale 0.254
   python3 convert_capsym_log.py VCC_ARROW.log --scale 0.254 --lib power_capsym.kicad_sym
+
+Whole folder in one process (worker pool, library written once):
+  python3 convert_capsym_log.py --batch /path/to/logs/capsym.olb/Symbols --lib power_capsym.kicad_sym
 """
 
-import argparse, re, sys, math, hashlib
+import argparse, re, sys, math, hashlib, mmap, os
+from functools import lru_cache, partial
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
 
+# ───────────────── regexes ─────────────────
+# Log scanning patterns run on the raw bytes of the (mmapped) log.
+# Name/library helpers work on str.
+# At most one name hit per line, never crossing a line end; normalName
+# anywhere in a line beats an earlier name on the same line.
+_RE_NAME_COMBINED = re.compile(
+    rb'(?m)^(?:[^\n]*?\bnormalName[^\S\r\n]*=[^\S\r\n]*(?P<nn>.+)'
+    rb'|[^\n]*?\bname[^\S\r\n]*=[^\S\r\n]*(?P<n>.+))'
+)
+_RE_PIN_MARK    = re.compile(rb'StructSymbolPin|SymbolPinScalar')
+# One event per line, scanned over the whole file. Alternatives are tried in
+# order at the (whitespace-stripped) line start, so a line holding several
+# tokens resolves exactly like the old per-line if-chain did; lines matching
+# nothing never reach Python.
+_RE_EVENT       = re.compile(
+    rb'(?m)^[^\S\n]*(?:'
+    rb'[^\n]*?(?P<line>PrimLine|\bLine\b)'
+    rb'|[^\n]*?(?P<rect>PrimRect|\bRect\b)'
+    rb'|[^\n]*?(?P<ell>PrimEllipse|\bEllipse\b)'
+    rb'|[^\n]*?(?P<endrect>Ending OOCP::PrimRect::read)'
+    rb'|[^\n]*?(?P<endell>Ending OOCP::PrimEllipse::read)'
+    rb'|(?P<dbg>\[debug\])'
+    rb'|[^\n]*?(?P<pin>StructSymbolPin|SymbolPinScalar)'
+    rb'|(?P<coord>(?P<ckey>x1|y1|x2|y2)[^\S\n]*=[^\S\n]*(?P<cval>-?\d+(?:\.\d+)?))'
+    rb'|(?P<field>(?P<fkey>startX|startY|hotptX|hotptY|isLeftPointing|isRightPointing|'
+    rb'isUpPointing|isDownPointing|isClock)[^\S\n]*=[^\S\n]*(?P<fval>[-\w.]+))'
+    rb')'
+)
+_RE_UNSAFE      = re.compile(r'[^A-Za-z0-9_.+\- ]+')
+_RE_SAFE_NAME   = re.compile(r'[A-Za-z0-9_+\-][A-Za-z0-9_.+\-]*')
+_RE_LIB_TAIL    = re.compile(r'\)\s*$')
+_RE_SYMBOL_HEAD = re.compile(r'(?m)^[^\S\n]*\(symbol "([^"\n]*)"')
+
+# matches are read by group number: tag per lastindex, plus the sub-group slots
+_EVENT_GROUPS = _RE_EVENT.groupindex
+_EVENT_TAG = {i: tag for tag, i in _EVENT_GROUPS.items()}
+_CKEY, _CVAL, _FKEY, _FVAL = (_EVENT_GROUPS[g] for g in ("ckey", "cval", "fkey", "fval"))
+_NN_INDEX  = 1  # (?P<nn>...) in _RE_NAME_COMBINED
+
+# coordinate slot per key and the mask once all four have been read
+_IDX = {b"x1": 0, b"y1": 1, b"x2": 2, b"y2": 3}
+_ALL_SEEN = 0b1111
+
+# invariant parts of every emitted power symbol
+_SYM_HDR       = '  (pin_numbers hide) (pin_names (offset 0)) (in_bom no) (on_board no)\n'
+_PROP_REF_TMPL = '  (property "Reference" "#PWR" (at 0 %s 0) (effects (font (size 1.27 1.27))))\n'
+_PROP_VAL_TMPL = '  (property "Value" "%s" (at 0 %s 0) (effects (font (size 1.27 1.27))))\n'
+_PIN_TMPL      = ('  (pin power_in line (at 0 0 %s) (length 0)\n'
+                  '    (name "" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))\n')
+
+# unit-circle vertices of the default 36-gon (same angles as the general case)
+_UNIT_CIRCLE_36 = tuple((math.cos(2*math.pi*i/36), math.sin(2*math.pi*i/36)) for i in range(36))
+
+def _skey(x1, y1, x2, y2):
+    """Direction-agnostic segment key on micro-unit ints."""
+    ax = round(x1*1_000_000); ay = round(y1*1_000_000)
+    bx = round(x2*1_000_000); by = round(y2*1_000_000)
+    return (ax, ay, bx, by) if (ax, ay) <= (bx, by) else (bx, by, ax, ay)
+
+def _find_symbol_span(txt, sym_name, pos=0):
+    """(start, end) of the next top-level (symbol "NAME" ...) block at/after pos, or None.
+
+    start includes the newline and indent in front of the block; end is just
+    past its balanced closing paren (quoted strings are skipped).
+    """
+    key = f'(symbol "{sym_name}"'
+    n = len(txt)
+    while True:
+        i = txt.find(key, pos)
+        if i < 0:
+            return None
+        pos = i + len(key)
+        start = txt.rfind("\n", 0, i)
+        if start < 0 or txt[start+1:i].strip():
+            continue  # not at the start of a line
+        depth = 0; in_str = False; j = i
+        while j < n:
+            c = txt[j]
+            if in_str:
+                if c == "\\": j += 1
+                elif c == '"': in_str = False
+            elif c == '"': in_str = True
+            elif c == "(": depth += 1
+            elif c == ")":
+                depth -= 1
+                if depth == 0:
+                    return start, j + 1
+            j += 1
+        return None  # unbalanced tail
+
+def _symbol_blocks(txt):
+    """{name: block} for the top-level (symbol "NAME" ...) blocks of a library text, in file order."""
+    out = {}
+    pos = 0
+    while True:
+        m = _RE_SYMBOL_HEAD.search(txt, pos)
+        if not m:
+            return out
+        name = m.group(1)
+        span = _find_symbol_span(txt, name, m.start())
+        if not span:
+            return out
+        out.pop(name, None)
+        out[name] = txt[span[0]+1:span[1]]
+        pos = span[1]
+
 # ───────────────── helpers ─────────────────
 def angle_from_vec(vx, vy, eps=1e-6):
     if abs(vx) <= eps: vx = 0.0
@@ -30,17 +141,25 @@ def knum(x):
     s = f"{x:.6f}".rstrip("0").rstrip(".")
     return s if s else "0"
 
+@lru_cache(maxsize=2048)
+def _sanitize(raw: str) -> str:
+    """Regex/strip part of make_safe_name (pure, so cached across symbols)."""
+    raw = raw.strip().strip('"').strip("'")
+    # replace spaces with underscores, drop forbidden parens/quotes
+    return _RE_UNSAFE.sub("_", raw).replace(" ", "_")
+
 def make_safe_name(raw: str, fallback: str) -> str:
     """Sanitize symbol name for KiCad; ensure non-empty, printable, no quotes/spaces-only."""
     if raw is None:
         raw = ""
-    raw = raw.strip().strip('"').strip("'")
-    # replace spaces with underscores, drop forbidden parens/quotes
-    safe = re.sub(r'[^A-Za-z0-9_.+\- ]+', "_", raw).replace(" ", "_")
+    if _RE_SAFE_NAME.fullmatch(raw):
+        return raw  # already sanitized (e.g. the name parse_capsym_log returns)
+    safe = _sanitize(raw)
     if not safe:
         fb = fallback.strip().strip('"').strip("'").replace(" ", "_")
         if not fb:
             # deterministic tiny hash so multiple empties don't collide
+            raw = raw.strip().strip('"').strip("'")
             fb = "SYM_" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:8]
         safe = fb
     # KiCad dislikes leading dots
@@ -49,15 +168,16 @@ def make_safe_name(raw: str, fallback: str) -> str:
         safe = "SYM_" + hashlib.sha1(fallback.encode("utf-8")).hexdigest()[:8]
     return safe
 
-def polyline_block(pts, stroke_mm, sp="      "):
-    pts_s = " ".join(f"(xy {knum(x)} {knum(y)})" for x, y in pts)
+def polyline_block_2pt(x1, y1, x2, y2, stroke_s, sp="      "):
+    """One 2-point polyline; stroke_s is the already formatted stroke width."""
     # KiCad requires (stroke (width ..) (type ..)) and (fill (type ..))
     return (
-        f'{sp}(polyline (pts {pts_s}) '
-        f'(stroke (width {knum(stroke_mm)}) (type default)) '
-        f'(fill (type none)))\n'
+        '%s(polyline (pts (xy %s %s) (xy %s %s)) '
+        '(stroke (width %s) (type default)) (fill (type none)))\n'
+        % (sp, knum(x1), knum(y1), knum(x2), knum(y2), stroke_s)
     )
 
+@lru_cache(maxsize=2048)
 def heuristic_value_and_angle(name):
     n = (name or "").upper()
     if "GND" in n: return ("GND", 90)          # pin UP into symbol
@@ -66,125 +186,154 @@ def heuristic_value_and_angle(name):
         if k in n: return (k, 270)
     return (name, 90)
 
+# ───────────────── numeric kernels ─────────────────
+def _ellipse_edges(cx, cy, rx, ry, sides):
+    """Closed `sides`-gon ring on the ellipse: edge i joins vertex i to vertex i+1 (wrapping)."""
+    if sides == 36:
+        xs = [cx+rx*c for c, _ in _UNIT_CIRCLE_36]
+        ys = [cy+ry*s for _, s in _UNIT_CIRCLE_36]
+    else:
+        ts = [2*math.pi*i/sides for i in range(sides)]
+        xs = [cx+rx*c for c in map(math.cos, ts)]
+        ys = [cy+ry*s for s in map(math.sin, ts)]
+    return list(zip(xs, ys, xs[1:]+xs[:1], ys[1:]+ys[:1]))
+
+def _transform_segs(segs, hx, hy, kx, ky):
+    """Translate all segments by -hot and scale; mirroring is folded into the sign of kx/ky."""
+    return [((x1-hx)*kx, (y1-hy)*ky, (x2-hx)*kx, (y2-hy)*ky) for x1,y1,x2,y2 in segs]
+
 # ───────────── parser (tolerant) ───────────
 def parse_capsym_log(path: Path):
     """
     Returns dict with:
-      name: str
+      name: str (sanitized), name_raw: str or None (as found in the log)
       segs: [(x1,y1,x2,y2), ...]
       pin:  dict or None with keys startX,startY,hotptX,hotptY and flags
     """
-    lines = path.read_text(errors="ignore").splitlines()
-
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return _parse_capsym(b"", path.stem)   # mmap refuses empty files
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _parse_capsym(buf, path.stem)
+
+def _parse_capsym(txt, stem):
+    """parse_capsym_log on the raw log bytes (bytes or mmap)."""
     # name: prefer 'normalName = XYZ' else 'name = XYZ' else file stem
+    # (first normalName line wins; otherwise the last name line, as the old line loop did)
     raw_name = None
-    for ln in lines:
-        m = re.search(r'\bnormalName\s*=\s*(.+)', ln)
-        if m:
-            raw_name = m.group(1).strip()
+    for m in _RE_NAME_COMBINED.finditer(txt):
+        raw_name = m.group(m.lastindex)
+        if m.lastindex == _NN_INDEX:
             break
-        m = re.search(r'\bname\s*=\s*(.+)', ln)
-        if m:
-            raw_name = m.group(1).strip()
-    name = make_safe_name(raw_name, path.stem)
+    if raw_name is not None:
+        raw_name = raw_name.decode("utf-8", "ignore").strip()
+    name = make_safe_name(raw_name, stem)
 
     segs = []
     pin  = None
 
+    # direction-agnostic dedup as segments arrive: a repeat replaces the
+    # earlier copy in place (same result as the old dict post-pass)
+    slot = {}
+    def push(sg, _skey=_skey, _get=slot.get, _append=segs.append):
+        k = _skey(*sg)
+        i = _get(k)
+        if i is None:
+            slot[k] = len(segs); _append(sg)
+        else:
+            segs[i] = sg
+
     # states for primitive groups
     reading = None  # 'line'|'rect'|'ellipse'
-    rect = {"x1":None,"y1":None,"x2":None,"y2":None}
-    ell  = {"x1":None,"y1":None,"x2":None,"y2":None}
-    line = {"x1":None,"y1":None,"x2":None,"y2":None}
+    # coords are x1,y1,x2,y2 slots; *_seen is a bitmask of filled slots
+    rect = [0.0, 0.0, 0.0, 0.0]; rect_seen = 0
+    ell  = [0.0, 0.0, 0.0, 0.0]; ell_seen  = 0
+    line = [0.0, 0.0, 0.0, 0.0]; line_seen = 0
 
     def flush_rect():
-        if None in rect.values(): return
-        x1,y1,x2,y2 = rect["x1"],rect["y1"],rect["x2"],rect["y2"]
+        if rect_seen != _ALL_SEEN: return
+        x1,y1,x2,y2 = rect
         if x1==x2 or y1==y2: return
-        segs.extend([(x1,y1,x2,y1),(x2,y1,x2,y2),(x2,y2,x1,y2),(x1,y2,x1,y1)])
+        for sg in ((x1,y1,x2,y1),(x2,y1,x2,y2),(x2,y2,x1,y2),(x1,y2,x1,y1)):
+            push(sg)
 
     def flush_ellipse(ellipse_sides=36):
-        if None in ell.values(): return
-        x1,y1,x2,y2 = ell["x1"],ell["y1"],ell["x2"],ell["y2"]
+        if ell_seen != _ALL_SEEN: return
+        x1,y1,x2,y2 = ell
         cx = (x1+x2)/2.0; cy = (y1+y2)/2.0
         rx = abs(x2-x1)/2.0; ry = abs(y2-y1)/2.0
         if rx<=0 or ry<=0: return
-        sides = max(8, ellipse_sides)
-        pts=[]
-        for i in range(sides):
-            t = 2*math.pi*i/sides
-            pts.append((cx+rx*math.cos(t), cy+ry*math.sin(t)))
-        for a,b in zip(pts, pts[1:]+[pts[0]]):
-            segs.append((a[0],a[1],b[0],b[1]))
+        for sg in _ellipse_edges(cx, cy, rx, ry, max(8, ellipse_sides)):
+            push(sg)
+
+    # hot-loop bindings (LOAD_FAST instead of global/attribute lookups)
+    _float = float; _idx = _IDX; _all_seen = _ALL_SEEN; _tag = _EVENT_TAG
+    _pin_mark = _RE_PIN_MARK.search; _find = txt.find; _n = len(txt)
 
-    for ln in lines:
-        s = ln.strip()
+    for m in _RE_EVENT.finditer(txt):
+        tag = _tag[m.lastindex]
 
         # start of primitives (be liberal with token names)
-        if "PrimLine" in s or re.search(r'\bLine\b', s):
-            reading = "line"; line = {"x1":None,"y1":None,"x2":None,"y2":None}; continue
-        if "PrimRect" in s or re.search(r'\bRect\b', s):
-            reading = "rect"; rect = {"x1":None,"y1":None,"x2":None,"y2":None}; continue
-        if "PrimEllipse" in s or re.search(r'\bEllipse\b', s):
-            reading = "ellipse"; ell = {"x1":None,"y1":None,"x2":None,"y2":None}; continue
+        if tag == "line":
+            reading = "line"; line_seen = 0; continue
+        if tag == "rect":
+            reading = "rect"; rect_seen = 0; continue
+        if tag == "ell":
+            reading = "ellipse"; ell_seen = 0; continue
 
         # numeric coords capture
-        m = re.match(r'(x1|y1|x2|y2)\s*=\s*(-?\d+(\.\d+)?)', s)
-        if m and reading:
-            key = m.group(1); val = float(m.group(2))
+        if tag == "coord":
+            if not reading:
+                continue
+            i = _idx[m.group(_CKEY)]; val = _float(m.group(_CVAL))
             if reading == "line":
-                line[key] = val
-                if all(v is not None for v in line.values()):
-                    segs.append((line["x1"],line["y1"],line["x2"],line["y2"]))
+                line[i] = val; line_seen |= 1 << i
+                if line_seen == _all_seen:
+                    push(tuple(line))
                     reading=None
             elif reading == "rect":
-                rect[key] = val
+                rect[i] = val; rect_seen |= 1 << i
             elif reading == "ellipse":
-                ell[key] = val
+                ell[i] = val; ell_seen |= 1 << i
             continue
 
         # primitive end markers (some logs have explicit endings)
-        if "Ending OOCP::PrimRect::read" in s:
+        if tag == "endrect":
             flush_rect(); reading=None; continue
-        if "Ending OOCP::PrimEllipse::read" in s:
-            flush_ellipse(); reading=None; continue
-        if reading=="rect" and s.startswith("[debug]"):
-            flush_rect(); reading=None; continue
-        if reading=="ellipse" and s.startswith("[debug]"):
+        if tag == "endell":
             flush_ellipse(); reading=None; continue
+        if tag == "dbg":
+            if reading=="rect":
+                flush_rect(); reading=None; continue
+            if reading=="ellipse":
+                flush_ellipse(); reading=None; continue
+            eol = _find(b"\n", m.end())
+            if not _pin_mark(txt, m.end(), eol if eol != -1 else _n):
+                continue
+            tag = "pin"
 
         # pin bucket (one pin for globals)
-        if "StructSymbolPin" in s or "SymbolPinScalar" in s:
+        if tag == "pin":
             pin = {}
             continue
         if pin is not None:
-            m = re.match(r'(startX|startY|hotptX|hotptY|isLeftPointing|isRightPointing|isUpPointing|isDownPointing|isClock)\s*=\s*([-\w.]+)', s)
-            if m:
-                k,v = m.group(1), m.group(2)
-                if k in ("startX","startY","hotptX","hotptY"):
-                    try: pin[k] = float(v)
-                    except: pass
-                else:
-                    pin[k] = v.lower() in ("1","true","yes")
+            k,v = m.group(_FKEY).decode("ascii"), m.group(_FVAL)
+            if k in ("startX","startY","hotptX","hotptY"):
+                try: pin[k] = _float(v)
+                except: pass
+            else:
+                pin[k] = v.lower() in (b"1",b"true",b"yes")
 
     # if rect/ellipse not closed by explicit marker, flush now
     flush_rect(); flush_ellipse()
 
-    # small dedup of identical segments (direction-agnostic)
-    def skey(sg):
-        x1,y1,x2,y2 = sg
-        a=(round(x1,6),round(y1,6)); b=(round(x2,6),round(y2,6))
-        return tuple(sorted((a,b)))
-    uniq = {}
-    for sg in segs:
-        uniq[skey(sg)] = sg
-    segs = list(uniq.values())
-
-    return {"name": name, "segs": segs, "pin": pin}
+    return {"name": name, "name_raw": raw_name, "segs": segs, "pin": pin}
 
 # ───────────── build KiCad block ───────────
 def build_symbol(sym, scale=0.254, mirror_x=False, mirror_y=False, stroke_mm=0.10):
-    name = make_safe_name(sym["name"].replace(".Normal","").replace(".","_"), "SYM")
+    # sym["name"] is sanitized by parse_capsym_log (sym["name_raw"] is the log's
+    # own spelling); dropping dots keeps it safe and non-empty, so no re-sanitizing
+    name = sym["name"].replace(".Normal","").replace(".","_")
     segs = sym["segs"]
     p = sym["pin"] or {}
 
@@ -192,12 +341,11 @@ def build_symbol(sym, scale=0.254, mirror_x=False, mirror_y=False, stroke_mm=0.1
     hx = float(p.get("hotptX", p.get("startX", 0.0)))
     hy = float(p.get("hotptY", p.get("startY", 0.0)))
 
-    def TX(x,y):
-        x = (x - hx) * scale
-        y = (y - hy) * scale
-        if mirror_x: x = -x
-        if mirror_y: y = -y
-        return (x,y)
+    # mirror folded into the per-axis scale factor: -(d*s) == d*(-s) exactly
+    kx = -scale if mirror_x else scale
+    ky = -scale if mirror_y else scale
+
+    val_txt, guess_ang = heuristic_value_and_angle(name)
 
     # determine pin angle
     ang = None
@@ -205,46 +353,54 @@ def build_symbol(sym, scale=0.254, mirror_x=False, mirror_y=False, stroke_mm=0.1
     if sx is not None and sy is not None and ("hotptX" in p or "hotptY" in p):
         ang = angle_from_vec(sx - hx, sy - hy, eps=1e-6)
     if ang is None:
-        _, ang = heuristic_value_and_angle(name)
+        ang = guess_ang
     if mirror_x: ang = (180 - ang) % 360
     if mirror_y: ang = (-ang) % 360
 
-    # graphics unit
+    # per-symbol constants, formatted once
+    stroke_s = knum(stroke_mm)
+    ref_y_s = knum(2.54*scale/0.254)
+    val_y_s = knum(-2.54*scale/0.254)
+
+    # graphics unit: transform all endpoints in one batched pass
     unit = [f'  (symbol "{name}_1_1"\n']
-    for x1,y1,x2,y2 in segs:
-        unit.append(polyline_block([TX(x1,y1), TX(x2,y2)], stroke_mm))
+    unit.extend(polyline_block_2pt(*sg, stroke_s) for sg in _transform_segs(segs, hx, hy, kx, ky))
     unit.append("  )\n")
 
-    # properties
-    val_txt, _ = heuristic_value_and_angle(name)
-    props = [
-        f'  (property "Reference" "#PWR" (at 0 {knum(2.54*scale/0.254)} 0) (effects (font (size 1.27 1.27))))\n',
-        f'  (property "Value" "{val_txt}" (at 0 {knum(-2.54*scale/0.254)} 0) (effects (font (size 1.27 1.27))))\n',
+    # block: properties, graphics unit, pin at origin
+    parts = [
+        '(symbol "%s"\n' % name, _SYM_HDR,
+        _PROP_REF_TMPL % ref_y_s, _PROP_VAL_TMPL % (val_txt, val_y_s),
+        *unit, _PIN_TMPL % ang, ')\n',
     ]
-
-    # pin at origin
-    pin = (
-        f'  (pin power_in line (at 0 0 {ang}) (length 0)\n'
-        f'    (name "" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))\n'
-    )
-
-    # block
-    out  = f'(symbol "{name}"\n'
-    out += '  (pin_numbers hide) (pin_names (offset 0)) (in_bom no) (on_board no)\n'
-    out += "".join(props)
-    out += "".join(unit)
-    out += pin
-    out += ')\n'
-    return out, name
+    return "".join(parts), name
 
 def write_library(blocks, dest: Path):
-    dest.write_text(
-        "(kicad_symbol_lib\n"
-        "  (version 20240205)\n"
-        "  (generator convert_capsym_log)\n"
-        + "\n".join(blocks) + "\n)",
-        encoding="utf-8"
-    )
+    parts = ["(kicad_symbol_lib\n  (version 20240205)\n  (generator convert_capsym_log)", "\n".join(blocks), ")"]
+    dest.write_text("\n".join(parts), encoding="utf-8")
+
+class LibraryWriter:
+    """In-memory .kicad_sym for batch runs: add() replaces by name, write() once at the end."""
+    def __init__(self, dest: Path):
+        self.dest = dest
+        self.blocks = {}
+
+    def add(self, block: str, sym_name: str):
+        # a re-added name moves to the end, like append_symbol_to_lib does
+        self.blocks.pop(sym_name, None)
+        self.blocks[sym_name] = block
+
+    def write(self):
+        blocks = self.blocks
+        if self.dest.exists():
+            # keep what is already there, same as repeated single-file appends
+            # (a malformed library is regenerated, as append_symbol_to_lib does)
+            txt = self.dest.read_text(encoding="utf-8")
+            blocks = _symbol_blocks(txt) if _RE_LIB_TAIL.search(txt) else {}
+            for name, block in self.blocks.items():
+                blocks.pop(name, None)
+                blocks[name] = block
+        write_library(list(blocks.values()), self.dest)
 
 def append_symbol_to_lib(lib: Path, block: str, sym_name: str):
     """Append block to an existing .kicad_sym; replace any prior symbol with same name."""
@@ -252,15 +408,29 @@ def append_symbol_to_lib(lib: Path, block: str, sym_name: str):
         write_library([block], lib)
         return
 
+    with lib.open("r+b") as fh:
+        raw = fh.read()
+        if f'(symbol "{sym_name}"'.encode("utf-8") not in raw:
+            # nothing to replace: overwrite the closing ')' in place
+            end = len(raw.rstrip())
+            if end and raw[end-1:end] == b")":
+                nl = "\r\n" if b"\r\n" in raw else "\n"
+                fh.seek(end - 1)
+                fh.write(("\n" + block + ")\n").replace("\n", nl).encode("utf-8"))
+                fh.truncate()
+                return
+
     txt = lib.read_text(encoding="utf-8")
 
-    # Drop existing symbol with same name (top-level only).
-    # Matches: newline + (symbol "NAME" ... ) up to the next top-level '(' or file end before final ')'
-    pat = re.compile(rf'(\n\s*\(symbol\s+"{re.escape(sym_name)}"[\s\S]*?\)\s*)(?=\n\(|\n\))')
-    txt = pat.sub("\n", txt)
+    # Drop existing symbol(s) with same name (top-level only), whole balanced block
+    span = _find_symbol_span(txt, sym_name)
+    while span:
+        start, end = span
+        txt = txt[:start] + txt[end:]
+        span = _find_symbol_span(txt, sym_name, start)
 
     # Ensure file ends with a single ')' and append before it.
-    m = re.search(r'\)\s*$', txt)
+    m = _RE_LIB_TAIL.search(txt)
     if not m:
         # malformed library — regenerate
         write_library([block], lib)
@@ -270,311 +440,43 @@ def append_symbol_to_lib(lib: Path, block: str, sym_name: str):
     lib.write_text(new, encoding="utf-8")
 
 # ───────────────────── CLI ─────────────────
-def main():
-    pa = argparse.ArgumentParser(description="Convert CAPSYM OpenOrCadParser *.log → KiCad .kicad_sym")
-    pa.add_argument("logfile")
-    pa.add_argument("--scale", type=float, default=0.254, help="Coordinate scale (mil→mm = 0.254)")
-    pa.add_argument("--mirror-x", action="store_true", help="Mirror X (left↔right)")
-    pa.add_argument("--mirror-y", action="store_true", help="Mirror Y (up↔down)")
-    pa.add_argument("--stroke-mm", type=float, default=0.10, help="Stroke width for graphics (mm)")
-    pa.add_argument("--lib", help="Append/create this .kicad_sym instead of per-symbol files")
-    args = pa.parse_args()
-
-    log = Path(args.logfile).expanduser().resolve()
-    if not log.is_file():
-        sys.exit(f"Log not found: {log}")
-
+def convert_one(log: Path, args):
+    """Parse + build one log; returns (block, safe_name), or None if nothing is drawable."""
     sym = parse_capsym_log(log)
     if not sym["segs"] and sym["pin"] is None:
-        sys.exit("No drawable symbol found")
-
-    block, safe = build_symbol(
+        return None
+    return build_symbol(
         sym, scale=args.scale, mirror_x=args.mirror_x, mirror_y=args.mirror_y, stroke_mm=args.stroke_mm
     )
 
-    if args.lib:
-        lib = Path(args.lib).expanduser().resolve()
-        append_symbol_to_lib(lib, block, safe)
-        print(f'Wrote 1 symbol → {lib}')
-    else:
-        out = log.with_suffix("").with_name(f"{safe}.kicad_sym")
-        write_library([block], out)
-        print(f"Wrote {out}")
-
-if __name__ == "__main__":
-    main()
-#!/usr/bin/env python3
-"""
-convert_capsym_log.py – Convert OpenOrCadParser CAPSYM *.log → KiCad .kicad_sym
-
-Typical usage with your batch runner:
-  python3 run_all_logs.py "/path/to/logs/capsym.olb/Symbols" \
-    --scale 0.254 \
-    --convert-script /path/to/convert_capsym_log.py \
-    --out-lib /path/to/converted/converted_capsym.kicad_sym
-
-Direct usage:
-  python3 convert_capsym_log.py GND.log --scale 0.254
-  python3 convert_capsym_log.py VCC_ARROW.log --scale 0.254 --lib power_capsym.kicad_sym
-"""
-
-import argparse, re, sys, math, hashlib
-from pathlib import Path
-
-
-def angle_from_vec(vx, vy, eps=1e-6):
-    if abs(vx) <= eps: vx = 0.0
-    if abs(vy) <= eps: vy = 0.0
-    if vx == 0.0 and vy == 0.0: return None
-    if vy == 0.0: return 0 if vx > 0 else 180
-    if vx == 0.0: return 90 if vy > 0 else 270
-    if abs(vx) >= abs(vy): return 0 if vx > 0 else 180
-    return 90 if vy > 0 else 270
-
-def knum(x):
-    s = f"{x:.6f}".rstrip("0").rstrip(".")
-    return s if s else "0"
-
-def make_safe_name(raw: str, fallback: str) -> str:
-    """Sanitize symbol name for KiCad; ensure non-empty, printable, no quotes/spaces-only."""
-    if raw is None:
-        raw = ""
-    raw = raw.strip().strip('"').strip("'")
-    # replace spaces with underscores, drop forbidden parens/quotes
-    safe = re.sub(r'[^A-Za-z0-9_.+\- ]+', "_", raw).replace(" ", "_")
-    if not safe:
-        fb = fallback.strip().strip('"').strip("'").replace(" ", "_")
-        if not fb:
-            # deterministic tiny hash so multiple empties don't collide
-            fb = "SYM_" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:8]
-        safe = fb
-    # KiCad dislikes leading dots
-    safe = safe.lstrip(".")
-    if not safe:
-        safe = "SYM_" + hashlib.sha1(fallback.encode("utf-8")).hexdigest()[:8]
-    return safe
-
-def polyline_block(pts, stroke_mm, sp="      "):
-    pts_s = " ".join(f"(xy {knum(x)} {knum(y)})" for x, y in pts)
-    # KiCad requires (stroke (width ..) (type ..)) and (fill (type ..))
-    return (
-        f'{sp}(polyline (pts {pts_s}) '
-        f'(stroke (width {knum(stroke_mm)}) (type default)) '
-        f'(fill (type none)))\n'
-    )
-
-def heuristic_value_and_angle(name):
-    n = (name or "").upper()
-    if "GND" in n: return ("GND", 90)          # pin UP into symbol
-    if n.startswith("+") or n.startswith("-"): return (name, 270)  # rails from top → pin DOWN
-    for k in ("VCC","VDD","VSS","VDDA","VSSA","VEE"):
-        if k in n: return (k, 270)
-    return (name, 90)
-
-def parse_capsym_log(path: Path):
-    """
-    Returns dict with:
-      name: str
-      segs: [(x1,y1,x2,y2), ...]
-      pin:  dict or None with keys startX,startY,hotptX,hotptY and flags
-    """
-    lines = path.read_text(errors="ignore").splitlines()
-
-    # name: prefer 'normalName = XYZ' else 'name = XYZ' else file stem
-    raw_name = None
-    for ln in lines:
-        m = re.search(r'\bnormalName\s*=\s*(.+)', ln)
-        if m:
-            raw_name = m.group(1).strip()
-            break
-        m = re.search(r'\bname\s*=\s*(.+)', ln)
-        if m:
-            raw_name = m.group(1).strip()
-    name = make_safe_name(raw_name, path.stem)
-
-    segs = []
-    pin  = None
-
-    # states for primitive groups
-    reading = None  # 'line'|'rect'|'ellipse'
-    rect = {"x1":None,"y1":None,"x2":None,"y2":None}
-    ell  = {"x1":None,"y1":None,"x2":None,"y2":None}
-    line = {"x1":None,"y1":None,"x2":None,"y2":None}
-
-    def flush_rect():
-        if None in rect.values(): return
-        x1,y1,x2,y2 = rect["x1"],rect["y1"],rect["x2"],rect["y2"]
-        if x1==x2 or y1==y2: return
-        segs.extend([(x1,y1,x2,y1),(x2,y1,x2,y2),(x2,y2,x1,y2),(x1,y2,x1,y1)])
-
-    def flush_ellipse(ellipse_sides=36):
-        if None in ell.values(): return
-        x1,y1,x2,y2 = ell["x1"],ell["y1"],ell["x2"],ell["y2"]
-        cx = (x1+x2)/2.0; cy = (y1+y2)/2.0
-        rx = abs(x2-x1)/2.0; ry = abs(y2-y1)/2.0
-        if rx<=0 or ry<=0: return
-        sides = max(8, ellipse_sides)
-        pts=[]
-        for i in range(sides):
-            t = 2*math.pi*i/sides
-            pts.append((cx+rx*math.cos(t), cy+ry*math.sin(t)))
-        for a,b in zip(pts, pts[1:]+[pts[0]]):
-            segs.append((a[0],a[1],b[0],b[1]))
-
-    for ln in lines:
-        s = ln.strip()
-
-        # start of primitives (be liberal with token names)
-        if "PrimLine" in s or re.search(r'\bLine\b', s):
-            reading = "line"; line = {"x1":None,"y1":None,"x2":None,"y2":None}; continue
-        if "PrimRect" in s or re.search(r'\bRect\b', s):
-            reading = "rect"; rect = {"x1":None,"y1":None,"x2":None,"y2":None}; continue
-        if "PrimEllipse" in s or re.search(r'\bEllipse\b', s):
-            reading = "ellipse"; ell = {"x1":None,"y1":None,"x2":None,"y2":None}; continue
-
-        # numeric coords capture
-        m = re.match(r'(x1|y1|x2|y2)\s*=\s*(-?\d+(\.\d+)?)', s)
-        if m and reading:
-            key = m.group(1); val = float(m.group(2))
-            if reading == "line":
-                line[key] = val
-                if all(v is not None for v in line.values()):
-                    segs.append((line["x1"],line["y1"],line["x2"],line["y2"]))
-                    reading=None
-            elif reading == "rect":
-                rect[key] = val
-            elif reading == "ellipse":
-                ell[key] = val
-            continue
-
-        # primitive end markers (some logs have explicit endings)
-        if "Ending OOCP::PrimRect::read" in s:
-            flush_rect(); reading=None; continue
-        if "Ending OOCP::PrimEllipse::read" in s:
-            flush_ellipse(); reading=None; continue
-        if reading=="rect" and s.startswith("[debug]"):
-            flush_rect(); reading=None; continue
-        if reading=="ellipse" and s.startswith("[debug]"):
-            flush_ellipse(); reading=None; continue
-
-        # pin bucket (one pin for globals)
-        if "StructSymbolPin" in s or "SymbolPinScalar" in s:
-            pin = {}
-            continue
-        if pin is not None:
-            m = re.match(r'(startX|startY|hotptX|hotptY|isLeftPointing|isRightPointing|isUpPointing|isDownPointing|isClock)\s*=\s*([-\w.]+)', s)
-            if m:
-                k,v = m.group(1), m.group(2)
-                if k in ("startX","startY","hotptX","hotptY"):
-                    try: pin[k] = float(v)
-                    except: pass
-                else:
-                    pin[k] = v.lower() in ("1","true","yes")
-
-    # if rect/ellipse not closed by explicit marker, flush now
-    flush_rect(); flush_ellipse()
-
-    # small dedup of identical segments (direction-agnostic)
-    def skey(sg):
-        x1,y1,x2,y2 = sg
-        a=(round(x1,6),round(y1,6)); b=(round(x2,6),round(y2,6))
-        return tuple(sorted((a,b)))
-    uniq = {}
-    for sg in segs:
-        uniq[skey(sg)] = sg
-    segs = list(uniq.values())
-
-    return {"name": name, "segs": segs, "pin": pin}
-
-def build_symbol(sym, scale=0.254, mirror_x=False, mirror_y=False, stroke_mm=0.10):
-    name = make_safe_name(sym["name"].replace(".Normal","").replace(".","_"), "SYM")
-    segs = sym["segs"]
-    p = sym["pin"] or {}
-
-    # anchor = OrCAD hot-point → place at (0,0), translate graphics by -hot
-    hx = float(p.get("hotptX", p.get("startX", 0.0)))
-    hy = float(p.get("hotptY", p.get("startY", 0.0)))
-
-    def TX(x,y):
-        x = (x - hx) * scale
-        y = (y - hy) * scale
-        if mirror_x: x = -x
-        if mirror_y: y = -y
-        return (x,y)
-
-    # determine pin angle
-    ang = None
-    sx = p.get("startX"); sy = p.get("startY")
-    if sx is not None and sy is not None and ("hotptX" in p or "hotptY" in p):
-        ang = angle_from_vec(sx - hx, sy - hy, eps=1e-6)
-    if ang is None:
-        _, ang = heuristic_value_and_angle(name)
-    if mirror_x: ang = (180 - ang) % 360
-    if mirror_y: ang = (-ang) % 360
-
-    # graphics unit
-    unit = [f'  (symbol "{name}_1_1"\n']
-    for x1,y1,x2,y2 in segs:
-        unit.append(polyline_block([TX(x1,y1), TX(x2,y2)], stroke_mm))
-    unit.append("  )\n")
-
-    # properties
-    val_txt, _ = heuristic_value_and_angle(name)
-    props = [
-        f'  (property "Reference" "#PWR" (at 0 {knum(2.54*scale/0.254)} 0) (effects (font (size 1.27 1.27))))\n',
-        f'  (property "Value" "{val_txt}" (at 0 {knum(-2.54*scale/0.254)} 0) (effects (font (size 1.27 1.27))))\n',
-    ]
-
-    # pin at origin
-    pin = (
-        f'  (pin power_in line (at 0 0 {ang}) (length 0)\n'
-        f'    (name "" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))\n'
-    )
-
-    # block
-    out  = f'(symbol "{name}"\n'
-    out += '  (pin_numbers hide) (pin_names (offset 0)) (in_bom no) (on_board no)\n'
-    out += "".join(props)
-    out += "".join(unit)
-    out += pin
-    out += ')\n'
-    return out, name
-
-def write_library(blocks, dest: Path):
-    dest.write_text(
-        "(kicad_symbol_lib\n"
-        "  (version 20240205)\n"
-        "  (generator convert_capsym_log)\n"
-        + "\n".join(blocks) + "\n)",
-        encoding="utf-8"
-    )
-
-def append_symbol_to_lib(lib: Path, block: str, sym_name: str):
-    """Append block to an existing .kicad_sym; replace any prior symbol with same name."""
-    if not lib.exists():
-        write_library([block], lib)
-        return
-
-    txt = lib.read_text(encoding="utf-8")
-
-    # Drop existing symbol with same name (top-level only).
-    # Matches: newline + (symbol "NAME" ... ) up to the next top-level '(' or file end before final ')'
-    pat = re.compile(rf'(\n\s*\(symbol\s+"{re.escape(sym_name)}"[\s\S]*?\)\s*)(?=\n\(|\n\))')
-    txt = pat.sub("\n", txt)
-
-    # Ensure file ends with a single ')' and append before it.
-    m = re.search(r'\)\s*$', txt)
-    if not m:
-        # malformed library — regenerate
-        write_library([block], lib)
-        return
-
-    new = txt[:m.start()] + "\n" + block + ")\n"
-    lib.write_text(new, encoding="utf-8")
+def main_many(logs, args):
+    """--batch: convert in a worker pool, write every result from this process."""
+    lib = LibraryWriter(Path(args.lib).expanduser().resolve()) if args.lib else None
+    jobs = max(1, min(args.jobs or cpu_count(), len(logs)))
+    n = 0
+    with Pool(jobs) as pool:
+        # imap (not imap_unordered) so the library order follows the sorted log list
+        for log, res in zip(logs, pool.imap(partial(convert_one, args=args), logs)):
+            if res is None:
+                print(f"{log.name}: no drawable symbol – skipped")
+                continue
+            block, safe = res
+            n += 1
+            if lib:
+                lib.add(block, safe)
+            else:
+                out = log.with_suffix("").with_name(f"{safe}.kicad_sym")
+                write_library([block], out)
+                print(f"Wrote {out}")
+    if lib:
+        lib.write()
+        print(f"Wrote {n} symbols → {lib.dest}")
 
 def main():
     pa = argparse.ArgumentParser(description="Convert CAPSYM OpenOrCadParser *.log → KiCad .kicad_sym")
-    pa.add_argument("logfile")
+    pa.add_argument("logfile", nargs="?")
+    pa.add_argument("--batch", metavar="DIR", help="Convert every *.log under DIR (recursive) in one process")
+    pa.add_argument("--jobs", type=int, default=0, help="Worker processes for --batch (default: CPU count)")
     pa.add_argument("--scale", type=float, default=0.254, help="Coordinate scale (mil→mm = 0.254)")
     pa.add_argument("--mirror-x", action="store_true", help="Mirror X (left↔right)")
     pa.add_argument("--mirror-y", action="store_true", help="Mirror Y (up↔down)")
@@ -582,17 +484,24 @@ def main():
     pa.add_argument("--lib", help="Append/create this .kicad_sym instead of per-symbol files")
     args = pa.parse_args()
 
+    if args.batch:
+        root = Path(args.batch).expanduser().resolve()
+        logs = sorted(root.rglob("*.log"))
+        if not logs:
+            sys.exit(f"No *.log files under {root}")
+        main_many(logs, args)
+        return
+    if not args.logfile:
+        pa.error("logfile or --batch is required")
+
     log = Path(args.logfile).expanduser().resolve()
     if not log.is_file():
         sys.exit(f"Log not found: {log}")
 
-    sym = parse_capsym_log(log)
-    if not sym["segs"] and sym["pin"] is None:
+    res = convert_one(log, args)
+    if res is None:
         sys.exit("No drawable symbol found")
-
-    block, safe = build_symbol(
-        sym, scale=args.scale, mirror_x=args.mirror_x, mirror_y=args.mirror_y, stroke_mm=args.stroke_mm
-    )
+    block, safe = res
 
     if args.lib:
         lib = Path(args.lib).expanduser().resolve()
@@ -10,19 +10,64 @@ convert_log.py – OpenOrCadParser *.log ➜ KiCad 7/8 .kicad_sym
 • Optional X-mirror (left↔right)         →  python3 convert_log.py E.log --mirror-x
 • Optional Y-mirror (up↔down)            →  python3 convert_log.py E.log --mirror-y
 • Set outline stroke width (mm)          →  python3 convert_log.py E.log --stroke-mm 0.254
+• Build symbols on N worker processes    →  python3 convert_log.py E.log --jobs 4
 """
 
-import re, sys, argparse, math
+import re, sys, argparse, math, mmap, os
+from array import array
 from pathlib import Path
-from collections import OrderedDict
-
-def dedup(seq, key=lambda x: x):
-    seen = set()
-    for x in seq:
-        k = key(x)
-        if k not in seen:
-            seen.add(k)
-            yield x
+from functools import partial
+from multiprocessing import Pool, cpu_count
+
+# precompiled log patterns; parse_log runs them on the raw (mmapped) bytes
+# Only lines that can change parser state: trace lines ('[...'), and lines
+# holding a '=' or an OOCP:: marker (without the '\r' of CRLF files).
+# Everything else is skipped inside re. Bare 'x1 = -10' coordinate lines,
+# the bulk of a log, are decoded by the scan itself (ck/cv) and bypass the
+# line handlers; anything else on such a line takes the general path.
+_RE_LINE    = re.compile(
+    rb'(?m)^(?:'
+    rb'[^\S\r\n]*(?P<ck>x1|y1|x2|y2)[^\S\r\n]*=[^\S\r\n]*(?P<cv>-?\d+)[^\S\n]*$'
+    rb'|(?:\[|[^\r\n]*?(?:=|OOCP::))[^\r\n]*)'
+)
+_RE_NAME    = re.compile(rb'\bnormalName\s*=\s*([A-Za-z0-9_.-]+)')
+_RE_KV      = re.compile(rb'\s*(\w+)\s*=\s*(.+)')
+_RE_COORD   = re.compile(rb'\s*(x1|y1|x2|y2)\s*=\s*(-?\d+)')
+_RE_PROP    = re.compile(rb'(partValue|pcbFootprint)\s*=\s*(.+)')
+
+# 'key = value' line dispatch: which handler a leading key feeds
+_KEY_KIND = dict.fromkeys((b'x1', b'y1', b'x2', b'y2'), 'coord')
+_KEY_KIND.update(dict.fromkeys((
+    b'name',
+    b'isLeftPointing', b'isRightPointing', b'isClock',
+    b'isUpPointing', b'isDownPointing'), 'pin'))
+# pin coordinates are stored as numbers (see _pin_num)
+_KEY_KIND.update(dict.fromkeys((b'startX', b'startY', b'hotptX', b'hotptY'), 'pin_xy'))
+
+# log property -> KiCad property name
+_PROP_NAME = {b'partValue': 'PartValue', b'pcbFootprint': 'Footprint'}
+
+# coordinate key -> slot in the x1, y1, x2, y2 list
+_IDX = {b'x1': 0, b'y1': 1, b'x2': 2, b'y2': 3}
+
+def _text(b):
+    """Decode one captured field of the log (the log itself stays bytes)."""
+    return b.decode('utf-8', 'ignore').strip()
+
+def _pin_num(b):
+    """Pin coordinate as float once at capture; non-numeric text is kept as is."""
+    t = _text(b)
+    try:
+        return float(t)
+    except ValueError:
+        return t
+
+def dedup(seq, keys):
+    """Order-preserving dedup of *seq* by the parallel *keys*; first occurrence wins."""
+    seen = {}
+    for k, x in zip(keys, seq):
+        seen.setdefault(k, x)
+    return list(seen.values())
 
 def angle_from_vec(vx, vy, eps=1e-6):
     """Map a vector to KiCad angles (into-body): 0→, 90↑, 180←, 270↓.
@@ -66,10 +111,6 @@ def pin_angle(pin, eps=1e-6):
 def snap(v, eps):
     return float(round(v / eps) * eps) if eps > 0 else float(v)
 
-def snap_pt(pt, eps):
-    x, y = pt
-    return (snap(x, eps), snap(y, eps))
-
 def points_close(a, b, eps):
     return abs(a[0] - b[0]) <= eps and abs(a[1] - b[1]) <= eps
 
@@ -85,16 +126,17 @@ def seg_key(s, prec=6):
     return tuple(sorted((a, b)))
 
 def preprocess_segments(segs, eps, min_len=0.0):
-    """Snap endpoints to an epsilon grid, drop tiny/duplicate segments."""
-    out = []
-    for x1, y1, x2, y2 in segs:
-        a = snap_pt((float(x1), float(y1)), eps) if eps > 0 else (float(x1), float(y1))
-        b = snap_pt((float(x2), float(y2)), eps) if eps > 0 else (float(x2), float(y2))
-        s = (a[0], a[1], b[0], b[1])
-        if min_len > 0 and seg_len(s) < min_len:
-            continue
-        out.append(s)
-    return list(dedup(out, key=seg_key))  # direction-agnostic dedup
+    """Snap endpoints to an epsilon grid, drop tiny/duplicate segments.
+    Coordinates are already floats (parse_log normalizes them once).
+    """
+    if eps > 0:
+        out = [(snap(x1, eps), snap(y1, eps), snap(x2, eps), snap(y2, eps))
+               for x1, y1, x2, y2 in segs]
+    else:
+        out = list(segs)
+    if min_len > 0:
+        out = [s for s in out if not seg_len(s) < min_len]
+    return dedup(out, map(seg_key, out))  # direction-agnostic dedup
 
 def stitch_all_tolerant(segs, eps):
     """Partition segments into multiple continuous polylines with tolerant endpoint matching."""
@@ -164,29 +206,32 @@ def infer_angle_from_segs(start_xy, segs, eps):
 
 # parse OOCP log
 def parse_log(path, ellipse_sides=36):
-    lines = Path(path).read_text(errors='ignore').splitlines()
-    pool, cur = OrderedDict(), None
-    seg_state = None        # for PrimLine
-    rect_state = None       # for PrimRect
-    ell_state = None        # for PrimEllipse
-
-    def flush_rect():
-        nonlocal rect_state
-        if rect_state and all(rect_state.get(k) is not None for k in ('x1','y1','x2','y2')):
-            x1, y1, x2, y2 = rect_state['x1'], rect_state['y1'], rect_state['x2'], rect_state['y2']
+    with open(path, 'rb') as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return _parse_log(b'', ellipse_sides)    # mmap refuses empty files
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _parse_log(buf, ellipse_sides)
+
+def _parse_log(txt, ellipse_sides):
+    """parse_log on the raw log bytes (bytes or mmap)."""
+    pool, cur = {}, None
+    active = None           # kind of the open primitive: 'line' | 'rect' | 'ell'
+    co = [None, None, None, None]   # its x1, y1, x2, y2 (slot reused for every primitive)
+
+    def flush_rect(st):
+        if None not in st:
+            x1, y1, x2, y2 = st
             # add the 4 edges
-            cur['segments'].extend([
-                (x1, y1, x2, y1),
-                (x2, y1, x2, y2),
-                (x2, y2, x1, y2),
-                (x1, y2, x1, y1),
-            ])
-        rect_state = None
-
-    def flush_ellipse():
-        nonlocal ell_state
-        if ell_state and all(ell_state.get(k) is not None for k in ('x1','y1','x2','y2')):
-            x1, y1, x2, y2 = map(float, (ell_state['x1'], ell_state['y1'], ell_state['x2'], ell_state['y2']))
+            cur['segments'].extend((
+                x1, y1, x2, y1,
+                x2, y1, x2, y2,
+                x2, y2, x1, y2,
+                x1, y2, x1, y1,
+            ))
+
+    def flush_ellipse(st):
+        if None not in st:
+            x1, y1, x2, y2 = map(float, st)
             cx = (x1 + x2) / 2.0
             cy = (y1 + y2) / 2.0
             rx = abs(x2 - x1) / 2.0
@@ -198,104 +243,110 @@ def parse_log(path, ellipse_sides=36):
                     pts.append((cx + rx * math.cos(t), cy + ry * math.sin(t)))
                 # close ring
                 for a, b in zip(pts, pts[1:] + [pts[0]]):
-                    cur['segments'].append((a[0], a[1], b[0], b[1]))
-        ell_state = None
-
-    for ln in lines:
-        # new symbol bucket
-        m = re.search(r'\bnormalName\s*=\s*([A-Za-z0-9_.-]+)', ln)
-        if m:
-            cur = pool.setdefault(
-                m.group(1),
-                {'name': m.group(1), 'pins': [], 'segments': [], 'props': {}}
-            )
-            seg_state = rect_state = ell_state = None
+                    cur['segments'].extend((a[0], a[1], b[0], b[1]))
+
+    search_name = _RE_NAME.search; match_kv = _RE_KV.match; match_coord = _RE_COORD.match
+    search_prop = _RE_PROP.search; prop_name = _PROP_NAME
+    key_kind = _KEY_KIND; idx = _IDX
+
+    for line_m in _RE_LINE.finditer(txt):
+        ck = line_m.group('ck')
+        if ck is not None:
+            # fast path: coordinate of the open primitive, nothing else on the line
+            if cur is not None and active is not None:
+                co[idx[ck]] = int(line_m.group('cv'))
+                if active == 'line' and None not in co:
+                    cur['segments'].extend(co)
+                    active = None
             continue
+
+        ln = line_m.group()
+        # new symbol bucket (normalName may sit anywhere in the line)
+        if b"normalName" in ln:
+            m = search_name(ln)
+            if m:
+                nm = m.group(1).decode('ascii')
+                cur = pool.setdefault(
+                    nm,
+                    {'name': nm, 'pins': [], 'segments': array('d'), 'props': {}}
+                )
+                active = None
+                continue
         if cur is None:
             continue
 
+        # trace lines ("[debug] 0x..: Beginning OOCP::X::read") carry the block
+        # markers; the block name is tested in place right after the marker
+        at = ln.find(b"OOCP::") + 6
+        oocp = at > 5
+
         # pin start
-        if "OOCP::StructSymbolPin" in ln:
+        if oocp and ln.startswith(b"StructSymbolPin", at):
             cur['pins'].append({})
-            seg_state = rect_state = ell_state = None
+            active = None
             continue
 
+        # 'key = value' lines: classify once by key
+        kv = match_kv(ln)
+        kind = key_kind.get(kv.group(1)) if kv else None
+
         # pin attributes
-        if cur['pins']:
-            mm = re.match(r'\s*(\w+)\s*=\s*(.+)', ln)
-            if mm and mm.group(1) in (
-                'name', 'startX', 'startY', 'hotptX', 'hotptY',
-                'isLeftPointing', 'isRightPointing', 'isClock',
-                'isUpPointing', 'isDownPointing'
-            ):
-                cur['pins'][-1][mm.group(1)] = mm.group(2).strip()
+        if kind == 'pin' and cur['pins']:
+            cur['pins'][-1][kv.group(1).decode('ascii')] = _text(kv.group(2))
+        elif kind == 'pin_xy' and cur['pins']:
+            cur['pins'][-1][kv.group(1).decode('ascii')] = _pin_num(kv.group(2))
 
         # graphic primitives begin
-        if "OOCP::PrimLine" in ln:
-            seg_state = {'x1': None, 'y1': None, 'x2': None, 'y2': None}
-            rect_state = ell_state = None
-            continue
-        if "OOCP::PrimRect" in ln:
-            rect_state = {'x1': None, 'y1': None, 'x2': None, 'y2': None}
-            seg_state = ell_state = None
-            continue
-        if "OOCP::PrimEllipse" in ln:
-            ell_state = {'x1': None, 'y1': None, 'x2': None, 'y2': None}
-            seg_state = rect_state = None
-            continue
-
-        # collect PrimLine coords
-        if seg_state is not None:
-            mm = re.match(r'\s*(x1|y1|x2|y2)\s*=\s*(-?\d+)', ln)
+        if oocp:
+            if ln.startswith(b"PrimLine", at):
+                active = 'line'; co[0] = co[1] = co[2] = co[3] = None
+                continue
+            if ln.startswith(b"PrimRect", at):
+                active = 'rect'; co[0] = co[1] = co[2] = co[3] = None
+                continue
+            if ln.startswith(b"PrimEllipse", at):
+                active = 'ell'; co[0] = co[1] = co[2] = co[3] = None
+                continue
+
+        # coordinates of the open primitive (only ever from x1/y1/x2/y2 keys)
+        if active is not None:
+            mm = match_coord(ln) if kind == 'coord' else None
             if mm:
-                seg_state[mm.group(1)] = int(mm.group(2))
-                if all(v is not None for v in seg_state.values()):
-                    cur['segments'].append((
-                        seg_state['x1'], seg_state['y1'],
-                        seg_state['x2'], seg_state['y2']
-                    ))
-                    seg_state = None
-            elif ln.startswith('['):   # next trace block
-                seg_state = None
-
-        # collect PrimRect coords
-        if rect_state is not None:
-            mm = re.match(r'\s*(x1|y1|x2|y2)\s*=\s*(-?\d+)', ln)
-            if mm:
-                rect_state[mm.group(1)] = int(mm.group(2))
-            elif "Ending OOCP::PrimRect::read" in ln or ln.startswith('[debug] 0x'):
-                flush_rect()
-
-        # collect PrimEllipse coords
-        if ell_state is not None:
-            mm = re.match(r'\s*(x1|y1|x2|y2)\s*=\s*(-?\d+)', ln)
-            if mm:
-                ell_state[mm.group(1)] = int(mm.group(2))
-            elif "Ending OOCP::PrimEllipse::read" in ln or ln.startswith('[debug] 0x'):
-                flush_ellipse()
-
-        # properties
-        if "partValue" in ln:
-            mm = re.search(r'partValue\s*=\s*(.+)', ln)
-            if mm:
-                cur['props']['PartValue'] = mm.group(1).strip()
-        if "pcbFootprint" in ln:
-            mm = re.search(r'pcbFootprint\s*=\s*(.+)', ln)
-            if mm:
-                cur['props']['Footprint'] = mm.group(1).strip()
+                co[idx[mm.group(1)]] = int(mm.group(2))
+                if active == 'line' and None not in co:
+                    cur['segments'].extend(co)
+                    active = None
+            elif active == 'line':
+                if ln.startswith(b'['):     # next trace block
+                    active = None
+            elif ln.startswith(b'[debug] 0x') or (
+                    at >= 13 and ln.startswith(
+                        b"Ending OOCP::PrimRect::read" if active == 'rect'
+                        else b"Ending OOCP::PrimEllipse::read", at - 13)):
+                if active == 'rect':
+                    flush_rect(co)
+                else:
+                    flush_ellipse(co)
+                active = None
+
+        # properties (one search covers both keys)
+        mm = search_prop(ln)
+        if mm:
+            cur['props'][prop_name[mm.group(1)]] = _text(mm.group(2))
 
     # build list (keep pins-only symbols too)
     symbols = []
     for s in pool.values():
-        s['segments'] = list(dedup(s['segments'], key=tuple))
-        s['pins'] = list(dedup(
-            s['pins'],
-            key=lambda p: (
-                p.get('startX'), p.get('startY'),
-                p.get('hotptX', p.get('startX')),
-                p.get('hotptY', p.get('startY'))
-            )
-        ))
+        # flat x1, y1, x2, y2 array -> 4-tuples, once;
+        # order-preserving, first occurrence wins
+        fl = s['segments']
+        s['segments'] = list(dict.fromkeys(zip(fl[0::4], fl[1::4], fl[2::4], fl[3::4])))
+        pins = s['pins']
+        s['pins'] = dedup(pins, [
+            (p.get('startX'), p.get('startY'),
+             p.get('hotptX', p.get('startX')), p.get('hotptY', p.get('startY')))
+            for p in pins
+        ])
         symbols.append(s)
     return symbols
 
@@ -316,40 +367,63 @@ def build_symbol(sym, scale=1.0, join_eps=1.0, stitch_mode='auto', close_eps=Non
     if close_eps is None:
         close_eps = join_eps
 
-    def TX(x, y):  # transform point
-        if mirror_x: x = -x
-        if mirror_y: y = -y
-        return (x * scale, y * scale)
-
-    def TA(a):     # transform angle (KiCad uses 0→,90↑,180←,270↓)
-        if a is None:
-            return 0
-        if mirror_x:
-            a = (180 - a) % 360      # horizontal flip (left↔right)
-        if mirror_y:
-            a = (-a) % 360           # vertical flip (up↔down)
-        return a
+    # transform point / angle (KiCad uses 0→,90↑,180←,270↓), picked once per
+    # mirror combination so the per-point calls carry no flag tests
+    TX = {
+        (False, False): lambda x, y: (x * scale, y * scale),
+        (True,  False): lambda x, y: (-x * scale, y * scale),
+        (False, True):  lambda x, y: (x * scale, -y * scale),
+        (True,  True):  lambda x, y: (-x * scale, -y * scale),
+    }[(bool(mirror_x), bool(mirror_y))]
+    TA = {
+        (False, False): lambda a: 0 if a is None else a,
+        (True,  False): lambda a: 0 if a is None else (180 - a) % 360,          # left↔right
+        (False, True):  lambda a: 0 if a is None else (-a) % 360,               # up↔down
+        (True,  True):  lambda a: 0 if a is None else (-((180 - a) % 360)) % 360,
+    }[(bool(mirror_x), bool(mirror_y))]
 
     # safe symbol name
-    clean = re.sub(r'\.Normal$', '', sym['name'])
+    clean = sym['name']
+    if clean.endswith('.Normal'):
+        clean = clean[:-7]
     base  = clean.replace('.', '_')
 
     # geometry preprocessing
     segs = preprocess_segments(sym['segments'], eps=join_eps, min_len=0.0)
 
-    child = []
-
-    def draw_poly_pts(pts):
-        pts_s = ' '.join(f'(xy {x:g} {y:g})' for (x, y) in pts)
-        child.append(
-            f'      (polyline (pts {pts_s})'
-            f' (stroke (width {stroke_mm:g}) (type default)) (fill (type none)))'
+    # one flat fragment list for the whole block, joined once at the end;
+    # every line after the first starts with its own '\n'
+    out = [
+        f'  (symbol "{base}"',
+        '\n    (pin_names   (hide yes))',
+        '\n    (pin_numbers (hide yes))',
+        '\n    (property "Reference" "U" (at 0 5 0)'
+        ' (effects (font (size 1.27 1.27))))',
+        f'\n    (property "Value" "{base}" (at 0 -5 0)'
+        ' (effects (font (size 1.27 1.27))))'
+    ]
+    for k, v in sym['props'].items():
+        out.append(
+            f'\n    (property "{k}" "{v}" (at 0 0 0)'
+            ' (effects (font (size 1 1))))'
         )
+    out.append(f'\n    (symbol "{base}_1_1"')
+
+    stroke_s = f'{stroke_mm:g}'
+    # whole-polyline transform: sign flip (exact) then scale, same as TX
+    sgx = -1 if mirror_x else 1
+    sgy = -1 if mirror_y else 1
+
+    def draw_poly_pts(pts):  # pts in input units
+        out.extend((
+            '\n      (polyline (pts ',
+            ' '.join([f'(xy {x * sgx * scale:g} {y * sgy * scale:g})' for x, y in pts]),
+            ') (stroke (width ', stroke_s, ') (type default)) (fill (type none)))'
+        ))
 
     def draw_raw_segments():
         for x1, y1, x2, y2 in segs:
-            a = TX(x1, y1); b = TX(x2, y2)
-            draw_poly_pts([a, b])
+            draw_poly_pts(((x1, y1), (x2, y2)))
 
     if segs:
         if stitch_mode == 'off':
@@ -364,10 +438,19 @@ def build_symbol(sym, scale=1.0, join_eps=1.0, stitch_mode='auto', close_eps=Non
                     # auto-close if nearly closed
                     if points_close(pts[0], pts[-1], close_eps):
                         pts = pts[:] + [pts[0]]
-                    pts_tx = [TX(x, y) for (x, y) in pts]
-                    draw_poly_pts(pts_tx)
+                    draw_poly_pts(pts)
 
     STUB  = 10 * scale
+    stub_s = f'{STUB:g}'
+
+    # join_eps is fixed for the symbol: decide snapping and the pin angle
+    # tolerance (tied to join_eps) once, not per pin
+    if join_eps > 0:
+        _snap   = lambda v: snap(v, join_eps)
+        pin_eps = max(1e-6, 0.5 * join_eps)
+    else:
+        _snap   = lambda v: v
+        pin_eps = 1e-6
 
     auto = 1
     for p in sym['pins']:
@@ -383,20 +466,18 @@ def build_symbol(sym, scale=1.0, join_eps=1.0, stitch_mode='auto', close_eps=Non
             name   = raw if raw else "~"
 
         # KiCad pin anchor = electrical (outer) end → use HOT.
-        hx = float(p.get('hotptX', p['startX']))
-        hy = float(p.get('hotptY', p['startY']))
-        sx = float(p['startX'])
-        sy = float(p['startY'])
+        # coordinates were converted to float by parse_log
+        hx = p.get('hotptX', p['startX'])
+        hy = p.get('hotptY', p['startY'])
+        sx = p['startX']
+        sy = p['startY']
 
         # snap for robust matching and placement
-        hx_s, hy_s = (snap(hx, join_eps), snap(hy, join_eps)) if join_eps > 0 else (hx, hy)
-        sx_s, sy_s = (snap(sx, join_eps), snap(sy, join_eps)) if join_eps > 0 else (sx, sy)
+        hx_s, hy_s = _snap(hx), _snap(hy)
+        sx_s, sy_s = _snap(sx), _snap(sy)
 
         ax, ay = TX(hx_s, hy_s)
 
-        # Angle with axis-aware tolerance (tie to join_eps)
-        pin_eps = max(1e-6, 0.5 * join_eps) if join_eps > 0 else 1e-6
-
         # Normal angle: HOT→START (into-body)
         ang_into = angle_from_vec(sx - hx, sy - hy, eps=pin_eps)
 
@@ -407,45 +488,57 @@ def build_symbol(sym, scale=1.0, join_eps=1.0, stitch_mode='auto', close_eps=Non
         else:
             ang = TA(ang_into)
 
-        child.append(
-            '      (pin passive line (at {x:g} {y:g} {a}) (length {l:g})'
-            ' (name "{name}") (number "{n}"))'
-            .format(x=ax, y=ay, a=ang, l=STUB, name=name, n=number)
+        out.append(
+            f'\n      (pin passive line (at {ax:g} {ay:g} {ang}) (length {stub_s})'
+            f' (name "{name}") (number "{number}"))'
         )
 
-    child_block = '\n'.join(child)
+    out.append('\n    )\n  )')
+    return ''.join(out), base
 
-    lines = [
-        f'  (symbol "{base}"',
-        '    (pin_names   (hide yes))',
-        '    (pin_numbers (hide yes))',
-        '    (property "Reference" "U" (at 0 5 0)'
-        ' (effects (font (size 1.27 1.27))))',
-        f'    (property "Value" "{base}" (at 0 -5 0)'
-        ' (effects (font (size 1.27 1.27))))'
-    ]
-    for k, v in sym['props'].items():
-        lines.append(
-            f'    (property "{k}" "{v}" (at 0 0 0)'
-            ' (effects (font (size 1 1))))'
-        )
 
-    lines.append(f'    (symbol "{base}_1_1"')
-    if child_block:
-        lines.append(child_block)
-    lines.append('    )')
-    lines.append('  )')
+def _library_chunks(blocks):
+    yield "(kicad_symbol_lib\n  (version 20240205)\n  (generator OOCP-Log-Converter)\n"
+    for i, block in enumerate(blocks):
+        if i:
+            yield "\n"
+        yield block
+    yield "\n)"
 
-    return '\n'.join(lines), base
+def write_library(blocks, dest):
+    # large buffer: blocks are streamed, flushed to disk in few big writes
+    with open(dest, 'w', encoding='utf-8', buffering=1 << 20) as fh:
+        fh.writelines(_library_chunks(blocks))
 
+def library_text(blocks):
+    """The text write_library would put on disk, kept in memory."""
+    return ''.join(_library_chunks(blocks))
 
-def write_library(blocks, dest):
-    Path(dest).write_text(
-        "(kicad_symbol_lib\n  (version 20240205)\n"
-        "  (generator OOCP-Log-Converter)\n"
-        + "\n".join(blocks) + "\n)",
-        encoding='utf-8'
+def convert(logfile, scale=1.0, join_eps=1.0, stitch_mode='auto', ellipse_sides=36,
+            mirror_x=False, mirror_y=False, stroke_mm=0.254, jobs=1):
+    """
+    Parse logfile and build every symbol in it.
+    Returns [(block, safe_name)] in log order; [] when the log holds no symbol.
+    """
+    symbols = parse_log(logfile, ellipse_sides=ellipse_sides)
+    if not symbols:
+        return []
+
+    build = partial(
+        build_symbol,
+        scale=scale,
+        join_eps=join_eps,
+        stitch_mode=stitch_mode,
+        mirror_x=mirror_x,
+        mirror_y=mirror_y,
+        stroke_mm=stroke_mm
     )
+    # symbols are independent; a pool only pays off for large libraries
+    jobs = max(1, min(jobs or cpu_count(), len(symbols)))
+    if jobs > 1:
+        with Pool(jobs) as pool:
+            return pool.map(build, symbols)   # map keeps the log order
+    return list(map(build, symbols))
 
 def main():
     pa = argparse.ArgumentParser(description="Convert OOCP log ➜ KiCad symbol")
@@ -466,25 +559,18 @@ def main():
                     help='stroke width for symbol graphics in mm')
     pa.add_argument('--lib',
                     help='append / create this .kicad_sym instead of per-symbol files')
+    pa.add_argument('--jobs', type=int, default=1,
+                    help='worker processes for building symbols (0 = CPU count)')
     args = pa.parse_args()
 
-    symbols = parse_log(args.logfile, ellipse_sides=args.ellipse_sides)
-    if not symbols:
+    built = convert(args.logfile, scale=args.scale, join_eps=args.join_eps,
+                    stitch_mode=args.stitch, ellipse_sides=args.ellipse_sides,
+                    mirror_x=args.mirror_x, mirror_y=args.mirror_y,
+                    stroke_mm=args.stroke_mm, jobs=args.jobs)
+    if not built:
         sys.exit("No symbols found in log")
-
-    blocks, safe_names = [], []
-    for s in symbols:
-        block, safe = build_symbol(
-            s,
-            scale=args.scale,
-            join_eps=args.join_eps,
-            stitch_mode=args.stitch,
-            mirror_x=args.mirror_x,
-            mirror_y=args.mirror_y,
-            stroke_mm=args.stroke_mm
-        )
-        blocks.append(block)
-        safe_names.append(safe)
+    blocks     = [block for block, _ in built]
+    safe_names = [safe for _, safe in built]
 
     if args.lib:
         write_library(blocks, args.lib)
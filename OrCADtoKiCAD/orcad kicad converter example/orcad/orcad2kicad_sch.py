@@ -1,6 +1,8 @@
-import argparse, re, sys, uuid, math
+import argparse, re, sys, uuid, math, os, mmap
+from functools import lru_cache
+from itertools import chain
+from multiprocessing import Pool, cpu_count
 import xml.etree.ElementTree as ET
-from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 
@@ -10,9 +12,25 @@ GRID = 2.54
 REF_DY = 2 * GRID
 VAL_DY = -2 * GRID
 FONT = "(effects (font (size 1.27 1.27)) (justify left))"
+# exact (cos, sin) for the quarter turns OrCAD placements use
+ROT_CS = {0: (1, 0), 90: (0, 1), 180: (-1, 0), 270: (0, -1)}
 
 EXT_RE = re.compile(r'\(extends\s+"([^"]+)"')
 EXTENDS_CLAUSE = re.compile(r'\s*\(extends\s+"[^"]+"\)')
+PAREN_RE = re.compile(r'[()]')
+# byte twins for scanning the mmap'd combined library without decoding it
+SYMBOL_NAME_B_RE = re.compile(rb'\(symbol\s+"([^"]+)"')
+PAREN_B_RE = re.compile(rb'[()]')
+# _clean_name: drop ".Normal", map anything else (incl. '.') to '_', squeeze runs
+NORMAL_SUFFIX_RE = re.compile(r'\.Normal$', re.IGNORECASE)
+BAD_CHAR_RE = re.compile(r'[^A-Za-z0-9_\-+]')  # keep + and -
+MULTI_UNDERSCORE_RE = re.compile(r'__+')
+# CAPSYM decorations dropped before matching power rails
+POWER_SUFFIX_RE = re.compile(r'_(ARROW|POWER|SIGNAL|BAR|UP|DOWN)$')
+PIN1_RE = re.compile(
+    r'\(pin\s+[^\)]*?\(at\s+([0-9.\-]+)\s+([0-9.\-]+)\s+[0-9]+\)[^\)]*?\(number\s+"1"',
+    re.DOTALL,
+)
 PIN_TYPE = {
     "0": "passive",
     "1": "input",
@@ -32,29 +50,53 @@ LIB_ID: Dict = {
     ("J", "4"): "Connector_Generic:Conn_01x4",
 }
 
+# result is already on the 0.001 grid: snap(mm(v)) == mm(v)
 mm = lambda v: round(float(v) * MIL10, 3) if v not in (None, "") else 0.0
-num = lambda x: ("%f" % x).rstrip("0").rstrip(".")
-xy = lambda p: f"(xy {num(p[0])} {num(p[1])})"
-q = lambda s: '"' + str(s).replace('"', r'\"') + '"'
 uid = lambda: str(uuid.uuid4())
 snap = lambda v: round(v, 3)
+# values, cells, pin counts and rail names repeat across parts: share one object
+_intern = lambda s: sys.intern(s) if s else s
+
+# coordinates are snapped to a 0.001 grid, so the same few values repeat
+@lru_cache(maxsize=4096)
+def _num(x: float) -> str:
+    return ("%f" % x).rstrip("0").rstrip(".")
+
+def num(x: float) -> str:
+    # 0.0 and -0.0 share one cache key but print as "0" and "-0"
+    return _num(x) if x else ("%f" % x).rstrip("0").rstrip(".")
+
+# wire endpoints repeat heavily (rails, shared nodes): format each point once
+@lru_cache(maxsize=16384)
+def _xy(p: Tuple[float, float]) -> str:
+    return f"(xy {num(p[0])} {num(p[1])})"
+
+def xy(p: Tuple[float, float]) -> str:
+    # a zero coordinate shares its key with -0.0; format those directly
+    return _xy(p) if p[0] and p[1] else f"(xy {num(p[0])} {num(p[1])})"
+
+def q(s) -> str:
+    s = str(s)
+    # most values carry no quote: skip the escaping pass for them
+    return f'"{s}"' if '"' not in s else '"' + s.replace('"', r'\"') + '"'
 
 # caches
 _symbol_blocks: Dict[str, str] = {}
 _symbol_pin1: Dict[str, Tuple[float, float]] = {}
-_combined_text_cache: Dict[str, str] = {}
+_combined_text_cache: Dict[str, bytes] = {}   # mmap'd, read-only
 _combined_names_cache: Dict[str, Set[str]] = {}
+_combined_index: Dict[str, Dict[str, int]] = {}
+_converted_files_cache: Dict[str, Set[str]] = {}
+_symbol_parents_cache: Dict[str, List[str]] = {}
 
 # ───────── helpers ─────────
+@lru_cache(maxsize=2048)   # cell/value names repeat across a schematic
 def _clean_name(s: Optional[str]) -> str:
     if not s:
         return ""
-    s = s.strip()
-    s = re.sub(r'\.Normal$', '', s, flags=re.IGNORECASE)
-    s = s.replace('.', '_')
-    s = re.sub(r'[^A-Za-z0-9_\-+]', '_', s)  # keep + and -
-    s = re.sub(r'__+', '_', s)
-    return s
+    s = NORMAL_SUFFIX_RE.sub('', s.strip())
+    s = BAD_CHAR_RE.sub('_', s)
+    return MULTI_UNDERSCORE_RE.sub('_', s)
 
 def _first_nonempty(*vals: Optional[str]) -> str:
     for v in vals:
@@ -62,35 +104,70 @@ def _first_nonempty(*vals: Optional[str]) -> str:
             return v.strip()
     return ""
 
+def _symbol_block_at(txt: str, p0: int) -> str:
+    """Slice the balanced (...) block opening at p0; only the parens are visited."""
+    depth = 0
+    for m in PAREN_RE.finditer(txt, p0):
+        depth += 1 if m.group() == "(" else -1
+        if depth == 0:
+            return txt[p0 : m.end()]
+    raise RuntimeError("Unbalanced parentheses in symbol")
+
 def _extract_symbol_block(txt: str, sym: str) -> str:
     p0 = txt.find(f'(symbol "{sym}"')
     if p0 == -1:
         raise RuntimeError(f'"{sym}" not found')
-    depth = 0
-    for i, ch in enumerate(txt[p0:], p0):
-        depth += (ch == "(") - (ch == ")")
-        if depth == 0:
-            return txt[p0 : i + 1]
-    raise RuntimeError("Unbalanced parentheses in symbol")
+    return _symbol_block_at(txt, p0)
 
-def _load_combined_text(path: Path) -> str:
+def _load_combined_text(path: Path):
+    """The combined library mapped read-only; pages are touched only where searched."""
     key = str(path)
-    if key not in _combined_text_cache:
-        _combined_text_cache[key] = path.read_text(encoding="utf-8", errors="ignore")
-    return _combined_text_cache[key]
+    buf = _combined_text_cache.get(key)
+    if buf is None:
+        with open(path, "rb") as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:   # empty file cannot be mapped
+                buf = b""
+        _combined_text_cache[key] = buf
+    return buf
+
+def _build_combined_index(path: Path) -> Dict[str, int]:
+    """Map every (symbol "Name") in the combined library to its first byte offset, in one scan."""
+    key = str(path)
+    index = _combined_index.get(key)
+    if index is None:
+        index = {}
+        for m in SYMBOL_NAME_B_RE.finditer(_load_combined_text(path)):
+            index.setdefault(m.group(1).decode("utf-8", "ignore"), m.start())
+        _combined_index[key] = index
+    return index
 
 def _combined_symbol_names(path: Optional[Path]) -> Set[str]:
     """Index all (symbol "Name") from the chosen combined library file."""
     if not path or not path.is_file():
         return set()
     key = str(path)
-    if key in _combined_names_cache:
-        return _combined_names_cache[key]
-    txt = _load_combined_text(path)
-    names = set(m.group(1) for m in re.finditer(r'\(symbol\s+"([^"]+)"', txt))
-    _combined_names_cache[key] = names
+    names = _combined_names_cache.get(key)
+    if names is None:
+        names = _combined_names_cache[key] = set(_build_combined_index(path))
     return names
 
+def _combined_symbol_block(path: Path, sym: str) -> str:
+    """Symbol block from the combined library; only its own bytes are decoded."""
+    buf = _load_combined_text(path)
+    p0 = _build_combined_index(path).get(sym)
+    if p0 is None or buf[p0 : p0 + 9] != b'(symbol "':   # mmap has no startswith
+        p0 = buf.find(f'(symbol "{sym}"'.encode())   # not indexed as written: plain search
+        if p0 == -1:
+            raise RuntimeError(f'"{sym}" not found')
+    depth = 0
+    for m in PAREN_B_RE.finditer(buf, p0):
+        depth += 1 if m.group() == b"(" else -1
+        if depth == 0:
+            return buf[p0 : m.end()].decode("utf-8", "ignore")
+    raise RuntimeError("Unbalanced parentheses in symbol")
+
 def _locate_combined_library(conv_root: Optional[Path],
                              converted_lib_file: Optional[Path],
                              converted_lib: str) -> Optional[Path]:
@@ -108,6 +185,20 @@ def _locate_combined_library(conv_root: Optional[Path],
             return p
     return None
 
+def _converted_file_names(conv_root: Path) -> Set[str]:
+    """Names with their own <Sym>.kicad_sym in the converted dir (one directory scan)."""
+    key = str(conv_root)
+    names = _converted_files_cache.get(key)
+    if names is None:
+        names = set()
+        if conv_root.is_dir():
+            with os.scandir(conv_root) as it:
+                for e in it:
+                    if e.name.endswith('.kicad_sym') and e.is_file():
+                        names.add(e.name[:-len('.kicad_sym')])
+        _converted_files_cache[key] = names
+    return names
+
 def _converted_has_symbol(conv_root: Optional[Path],
                           combined_path: Optional[Path],
                           sym: str) -> bool:
@@ -117,10 +208,8 @@ def _converted_has_symbol(conv_root: Optional[Path],
         return False
 
     # per-file, exact filename
-    if conv_root:
-        per = conv_root / f"{sym}.kicad_sym"
-        if per.is_file():
-            return True
+    if conv_root and sym in _converted_file_names(conv_root):
+        return True
 
     names = _combined_symbol_names(combined_path)
     if not names:
@@ -183,8 +272,9 @@ def read_symbol(sys_root: Path,
        - converted combined lib     combined_path
        - system KiCad lib           <symdir>/<Lib>.kicad_sym
     """
-    if lib_id in _symbol_blocks:
-        return _symbol_blocks[lib_id]
+    block = _symbol_blocks.get(lib_id)
+    if block is not None:
+        return block
 
     lib, sym = lib_id.split(":", 1)
 
@@ -197,13 +287,11 @@ def read_symbol(sys_root: Path,
             else:
                 if not combined_path or not combined_path.is_file():
                     raise RuntimeError(f'"{sym}" not found (checked {per_sym} and no combined lib)')
-                txt = _load_combined_text(combined_path)
-                block = _extract_symbol_block(txt, sym)
+                block = _combined_symbol_block(combined_path, sym)
         else:
             if not combined_path or not combined_path.is_file():
                 raise RuntimeError(f'Converted library not available for "{sym}"')
-            txt = _load_combined_text(combined_path)
-            block = _extract_symbol_block(txt, sym)
+            block = _combined_symbol_block(combined_path, sym)
     else:
         path = sys_root / f"{lib}.kicad_sym"
         if not path.is_file():
@@ -214,10 +302,7 @@ def read_symbol(sys_root: Path,
     _symbol_blocks[lib_id] = block
 
     # cache pin 1 (best-effort anchor if needed)
-    m = re.search(
-        r'\(pin\s+[^\)]*?\(at\s+([0-9.\-]+)\s+([0-9.\-]+)\s+[0-9]+\)[^\)]*?\(number\s+"1"',
-        block, re.MULTILINE | re.DOTALL,
-    )
+    m = PIN1_RE.search(block)
     _symbol_pin1[lib_id] = (float(m.group(1)), float(m.group(2))) if m else (0.0, 0.0)
     return block
 
@@ -228,166 +313,285 @@ def rename(block: str, new: str) -> str:
     p2 = block.find('"', p1)
     return block[:p1] + new + block[p2:]
 
+def _symbol_parents(lib_id: str, raw: str) -> List[str]:
+    """(extends ...) parents of a symbol as full lib_ids, cached per lib_id."""
+    parents = _symbol_parents_cache.get(lib_id)
+    if parents is None:
+        lib = lib_id.split(":", 1)[0]
+        parents = [p if ":" in p else f"{lib}:{p}" for p in EXT_RE.findall(raw)]
+        _symbol_parents_cache[lib_id] = parents
+    return parents
+
 def collect(sys_root: Path, conv_root: Optional[Path], combined_path: Optional[Path],
             converted_lib: str, lib_id: str, placed: Set[str], done: Set[str], out: List[str]) -> None:
-    if lib_id in done:
-        return
-    try:
-        raw = read_symbol(sys_root, conv_root, combined_path, converted_lib, lib_id)
-    except Exception as e:
-        print(f"[warn] Skipping missing symbol for {lib_id}: {e}", file=sys.stderr)
-        return
-
-    lib, short = lib_id.split(":", 1)
-    for parent in EXT_RE.findall(raw):
-        full = parent if ":" in parent else f"{lib}:{parent}"
-        collect(sys_root, conv_root, combined_path, converted_lib, full, placed, done, out)
-        base = full.split(":", 1)[1]
-        if base not in done:
-            try:
-                txt = read_symbol(sys_root, conv_root, combined_path, converted_lib, full)
-                out.append(rename(strip_extends(txt), base))
-                done.add(base)
-            except Exception as e:
-                print(f"[warn] Skipping missing parent symbol {full}: {e}", file=sys.stderr)
+    """Append lib_id and its extends-ancestors (ancestors first) to out.
 
-    name = lib_id if lib_id in placed else short
-    if name not in done:
-        out.append(rename(strip_extends(raw), name))
-        done.add(name)
+    Depth-first over an explicit stack of frames [lib_id, raw, parents, pending],
+    where pending is the parent whose own collection is in progress.
+    """
+    def enter(lid: str) -> Optional[list]:
+        if lid in done:
+            return None
+        try:
+            raw = read_symbol(sys_root, conv_root, combined_path, converted_lib, lid)
+        except Exception as e:
+            print(f"[warn] Skipping missing symbol for {lid}: {e}", file=sys.stderr)
+            return None
+        return [lid, raw, iter(_symbol_parents(lid, raw)), None]
+
+    top = enter(lib_id)
+    stack = [top] if top else []
+    on_stack = {f[0] for f in stack}   # lib_ids of the open frames
+    while stack:
+        frame = stack[-1]
+        full = frame[3]
+        if full is not None:
+            # parent collected: embed it under its short name as well
+            frame[3] = None
+            base = full.split(":", 1)[1]
+            if base not in done:
+                try:
+                    txt = read_symbol(sys_root, conv_root, combined_path, converted_lib, full)
+                    out.append(rename(strip_extends(txt), base))
+                    done.add(base)
+                except Exception as e:
+                    print(f"[warn] Skipping missing parent symbol {full}: {e}", file=sys.stderr)
+
+        full = next(frame[2], None)
+        if full is not None:
+            frame[3] = full
+            # a parent already on the stack would be an extends cycle
+            child = None if full in on_stack else enter(full)
+            if child:
+                stack.append(child)
+                on_stack.add(full)
+            continue
+
+        stack.pop()
+        on_stack.discard(frame[0])
+        lid, raw = frame[0], frame[1]
+        name = lid if lid in placed else lid.split(":", 1)[1]
+        if name not in done:
+            out.append(rename(strip_extends(raw), name))
+            done.add(name)
 
 # instance block (pin-1 anchor) 
+_MIRROR = {(False, False): "", (True, False): "    (mirror x)\n",
+           (False, True): "    (mirror y)\n", (True, True): "    (mirror x)\n    (mirror y)\n"}
+
+@lru_cache(maxsize=1024, typed=True)   # typed: rotation 0 and 0.0 print differently
+def _inst_template(lib: str, r, mx: bool, my: bool) -> tuple:
+    """
+    The parts of an instance block fixed by (lib_id, rotation, mirror):
+    text around the anchor, the pin-1 shift, and the Reference/Value/other
+    property offsets. Pin 1 is fixed once the symbol has been read.
+    """
+    px, py = _symbol_pin1.get(lib, (0.0, 0.0))
+    offsets = ((0, REF_DY), (0, VAL_DY), (0, 0))
+
+    if r == 0 and not mx and not my:
+        # common case: identity transform, anchor and properties just shift
+        dx, dy = px, py
+    else:
+        # exact for quarter turns
+        if r in ROT_CS:
+            cs, sn = ROT_CS[r]
+        else:
+            th = math.radians(r)
+            cs, sn = math.cos(th), math.sin(th)
+
+        # mirror as sign factors, shared by anchor and properties
+        sx = -1 if my else 1     # (mirror y) = horizontal flip
+        sy = -1 if mx else 1     # (mirror x) = vertical flip
+
+        # Anchor by pin 1 with mirror and rotation
+        px *= sx
+        py *= sy
+        dx = px * cs - py * sn
+        dy = px * sn + py * cs
+
+        # Property placements (same transform as above)
+        rotated = []
+        for off_x, off_y in offsets:
+            px_, py_ = off_x * sx, off_y * sy
+            rotated.append((px_ * cs - py_ * sn, px_ * sn + py_ * cs))
+        offsets = tuple(rotated)
+
+    head = f"  (symbol\n    (lib_id {q(lib)})\n    (at "
+    mid = f" {r})\n{_MIRROR[mx, my]}    (unit 1) (uuid "
+    prop_tail = f" {r}) {FONT})\n"
+    return head, mid, prop_tail, dx, dy, offsets
+
 def inst_block(c: dict) -> str:
     lib, x0, y0, r0 = c['lib'], *c['at']
     mx, my = c.get('flip', (False, False))
     r = r0 % 360
-    th = math.radians(r)
-
-    # Anchor by pin 1 with mirror and rotation
-    px, py = _symbol_pin1.get(lib, (0.0, 0.0))
-    if mx:               # (mirror x) = vertical flip
-        py = -py
-    if my:               # (mirror y) = horizontal flip
-        px = -px
-    dx = px * math.cos(th) - py * math.sin(th)
-    dy = px * math.sin(th) + py * math.cos(th)
+    head, mid, prop_tail, dx, dy, (ref_off, val_off, other_off) = _inst_template(lib, r, mx, my)
     x = snap(x0 - dx)
     y = snap(y0 - dy)
 
-    lines = [
-        "  (symbol",
-        f"    (lib_id {q(lib)})",
-        f"    (at {num(x)} {num(y)} {r})"
-    ]
-    if mx: lines.append("    (mirror x)")
-    if my: lines.append("    (mirror y)")
-    lines.append(f"    (unit 1) (uuid {q(c['uuid'])})")
-
-    # Property placements (same transform as above)
-    def place(name, txt, off_x, off_y):
-        px_, py_ = off_x, off_y
-        if mx: py_ = -py_
-        if my: px_ = -px_
-        dx_t = px_ * math.cos(th) - py_ * math.sin(th)
-        dy_t = px_ * math.sin(th) + py_ * math.cos(th)
-        return f'    (property "{name}" {q(txt)} (at {num(x + dx_t)} {num(y + dy_t)} {r}) {FONT})'
-
-    props = c['props'].copy()
-    ref = props.pop('Reference', None)
-    val = props.pop('Value', None)
-    if ref: lines.append(place("Reference", ref, 0, REF_DY))
-    if val: lines.append(place("Value", val, 0, VAL_DY))
-    for k, v in props.items():
-        lines.append(place(k, v, 0, 0))
+    def place(name, txt, off):
+        return f'    (property "{name}" {q(txt)} (at {num(x + off[0])} {num(y + off[1])}{prop_tail}'
 
-    lines.append("  )\n")
-    return "\n".join(lines)
+    props = c['props']
+    ref = props.get('Reference')
+    val = props.get('Value')
+    parts = [f"{head}{num(x)} {num(y)}{mid}{q(c['uuid'])})\n"]
+    if ref: parts.append(place("Reference", ref, ref_off))
+    if val: parts.append(place("Value", val, val_off))
+    for k, v in props.items():
+        if k not in ('Reference', 'Value'):
+            parts.append(place(k, v, other_off))
+    parts.append("  )\n")
+    return ''.join(parts)
+
+# below this many placements a worker pool costs more than it saves
+POOL_MIN_INSTANCES = 500
+
+def _init_inst_worker(pin1: Dict[str, Tuple[float, float]]):
+    # inst_block anchors on pin 1; spawned workers start with an empty cache
+    _symbol_pin1.update(pin1)
+
+def render_instances(insts: List[dict], jobs: int = 1) -> List[str]:
+    """inst_block for every placement, in order; on `jobs` processes when worth it."""
+    jobs = max(1, min(jobs or cpu_count(), len(insts) // 64 or 1))
+    if jobs > 1 and len(insts) >= POOL_MIN_INSTANCES:
+        with Pool(jobs, initializer=_init_inst_worker, initargs=(_symbol_pin1,)) as pool:
+            return pool.map(inst_block, insts, chunksize=64)   # map keeps the order
+    return list(map(inst_block, insts))
 
 # OrCAD XML reader
-class OrCadReader:
-    def __init__(self, xml_path: Path):
-        self.root = ET.parse(str(xml_path)).getroot()
-        self.strip_ns(self.root)
-
-    def strip_ns(self, elem):
-        for el in elem.iter():
-            if '}' in el.tag:
-                el.tag = el.tag.split('}', 1)[1]
-
-    def components(self) -> List[dict]:
-        comps = []
-        for pi in self.root.findall('.//PartInst'):
-            ref_el = pi.find('Reference/Defn')
-            val_el = pi.find('PartValue/Defn')
-            defn = pi.find('Defn')
-            if ref_el is None or defn is None:
-                continue
-
-            ref = ref_el.get('name')
-            val = (val_el.get('name') if val_el is not None else '')
-            pins = pi.get('pinCount') or ''
-
-            # OrCAD CellName from pkgName or GraphicName (strip ".Normal")
-            cell = pi.get('pkgName') or ''
-            gndef = pi.find('GraphicName/Defn')
-            if not cell and gndef is not None:
-                nm = gndef.get('name') or ''
-                cell = nm.split('.', 1)[0] if nm else ''
-            cell = _clean_name(cell)
-
-            # Position
-            x, y = snap(mm(defn.get('locX', '0'))), snap(mm(defn.get('locY', '0')))
-
-            # Rotation 
-            rot_steps_raw = defn.get('rotation', '0').strip()
-            try:
-                rot_steps = int(rot_steps_raw) % 4
-            except Exception:
-                rot_steps = 0
-
-            # We don't apply mirror-y by default
-            my = False
-
-            #Custom placement policy 
-            # Default: mirror x ON, rotation = OrCAD*90
-            mx = True
-            rot = (rot_steps * 90) % 360
+_localname = lambda tag: tag.rpartition('}')[2]   # '{ns}Defn' / 'Defn' -> 'Defn'
 
-            # Exception: rotation="1" = DO NOT mirror x, rotate clockwise 90° (270°)
-            if rot_steps == 1:
-                mx = False
-                rot = 270
-           
+def _defns(el) -> List:
+    """Direct <Defn> children of el, in document order."""
+    return [ch for ch in el if _localname(ch.tag) == 'Defn']
 
-            props = OrderedDict(Reference=ref, Value=val)
-            comps.append(dict(
-                ref=ref, val=val, cell=cell, pins=pins,
-                at=(x, y, rot),
-                flip=(mx, my),
-                props=props, uuid=uid(),
-            ))
-        return comps
-
-    def nets(self):
-        wires, juncs = [], []
-        for w in self.root.findall('.//WireScalar/Defn'):
-            a = (snap(mm(w.get('startX'))), snap(mm(w.get('startY'))))
-            b = (snap(mm(w.get('endX'))), snap(mm(w.get('endY'))))
-            wires.append((a, b))
-        for j in self.root.findall('.//Junction/Defn'):
-            juncs.append((snap(mm(j.get('locX'))), snap(mm(j.get('locY')))))
-        return wires, juncs
+def _first_defn(el):
+    for ch in el:
+        if _localname(ch.tag) == 'Defn':
+            return ch
+    return None
 
-    def power_globals(self) -> List[dict]:
+class OrCadReader:
+    """Reads the OrCAD XML in one streaming pass; the getters return its results."""
+    def __init__(self, xml_path: Path):
+        self.xml_path = xml_path
+        self._comps: List[dict] = []
+        self._wires: List[Tuple[Tuple[float, float], Tuple[float, float]]] = []
+        self._juncs: List[Tuple[float, float]] = []
+        self._globs: List[dict] = []
+        self._parse_once()
+
+    def _parse_once(self):
+        # dispatch on each element of interest once it is complete; every
+        # finished element outside a handled subtree is then detached from
+        # its parent, so only the open path from the root stays in memory
+        handlers = {
+            'PartInst': self._part_inst,
+            'WireScalar': self._wire_scalar,
+            'Junction': self._junction,
+            'Global': self._global,
+        }
+        path = []         # (element, handler) for each open element
+        in_handled = 0    # open elements that have a handler
+        for ev, el in ET.iterparse(str(self.xml_path), events=('start', 'end')):
+            if ev == 'start':
+                handler = handlers.get(_localname(el.tag))
+                path.append((el, handler))
+                if handler is not None:
+                    in_handled += 1
+                continue
+            handler = path.pop()[1]
+            if handler is not None:
+                in_handled -= 1
+                handler(el)
+                el.clear()
+            if not in_handled and path:
+                path[-1][0].remove(el)   # earlier siblings are gone: found at the front
+
+    def _part_inst(self, pi):
+        # one pass over the children; the first match of each wins, as find() did
+        defn = ref_el = val_el = gndef = None
+        for ch in pi:
+            t = _localname(ch.tag)
+            if t == 'Defn':
+                if defn is None:
+                    defn = ch
+            elif t == 'Reference':
+                if ref_el is None:
+                    ref_el = _first_defn(ch)
+            elif t == 'PartValue':
+                if val_el is None:
+                    val_el = _first_defn(ch)
+            elif t == 'GraphicName':
+                if gndef is None:
+                    gndef = _first_defn(ch)
+        if ref_el is None or defn is None:
+            return
+
+        ref = ref_el.get('name')
+        val = (_intern(val_el.get('name')) if val_el is not None else '')
+        pins = _intern(pi.get('pinCount') or '')
+
+        # OrCAD CellName from pkgName or GraphicName (strip ".Normal")
+        cell = pi.get('pkgName') or ''
+        if not cell and gndef is not None:
+            nm = gndef.get('name') or ''
+            cell = nm.split('.', 1)[0] if nm else ''
+        cell = _clean_name(cell)
+
+        # Position
+        x, y = mm(defn.get('locX', '0')), mm(defn.get('locY', '0'))
+
+        # Rotation 
+        rot_steps_raw = defn.get('rotation', '0').strip()
+        try:
+            rot_steps = int(rot_steps_raw) % 4
+        except Exception:
+            rot_steps = 0
+
+        # We don't apply mirror-y by default
+        my = False
+
+        #Custom placement policy 
+        # Default: mirror x ON, rotation = OrCAD*90
+        mx = True
+        rot = (rot_steps * 90) % 360
+
+        # Exception: rotation="1" = DO NOT mirror x, rotate clockwise 90° (270°)
+        if rot_steps == 1:
+            mx = False
+            rot = 270
+       
+
+        props = {'Reference': ref, 'Value': val}
+        self._comps.append(dict(
+            ref=ref, val=val, cell=cell, pins=pins,
+            at=(x, y, rot),
+            flip=(mx, my),
+            props=props, uuid=uid(),
+        ))
+
+    def _wire_scalar(self, ws):
+        for w in _defns(ws):
+            a = (mm(w.get('startX')), mm(w.get('startY')))
+            b = (mm(w.get('endX')), mm(w.get('endY')))
+            self._wires.append((a, b))
+
+    def _junction(self, jn):
+        for j in _defns(jn):
+            self._juncs.append((mm(j.get('locX')), mm(j.get('locY'))))
+
+    def _global(self, gl):
         """
-        Collect OrCAD Global (power) symbols with their positions.
+        Collect an OrCAD Global (power) symbol with its position.
         """
-        globs = []
-        for ge in self.root.findall('.//Global/Defn'):
-            name = ge.get('name') or ""
-            sym  = ge.get('symbolName') or ""
-            x = snap(mm(ge.get('locX', '0')))
-            y = snap(mm(ge.get('locY', '0')))
+        for ge in _defns(gl):
+            name = _intern(ge.get('name') or "")
+            sym  = _intern(ge.get('symbolName') or "")
+            x = mm(ge.get('locX', '0'))
+            y = mm(ge.get('locY', '0'))
 
             # OrCAD rotation is in 90° steps (0..3)
             rot_steps_raw = ge.get('rotation', '0').strip()
@@ -400,50 +604,70 @@ class OrCadReader:
             # Do NOT mirror power symbols by default.
             mx, my = False, False
 
-            globs.append(dict(
+            self._globs.append(dict(
                 name=name, symbol=sym,
                 at=(x, y, rot),
                 flip=(mx, my),
-                props=OrderedDict(),
+                props={},
                 uuid=uid(),
             ))
-        return globs
+
+    def components(self) -> List[dict]:
+        return self._comps
+
+    def nets(self):
+        return self._wires, self._juncs
+
+    def power_globals(self) -> List[dict]:
+        """
+        OrCAD Global (power) symbols with their positions.
+        """
+        return self._globs
 
 # simple fallback symbol (only if nothing found)
 def fallback_block(sym, sp='    ') -> str:
-    out = f'{sp}(symbol {q(sym["name"])}\n{sp}  (pin_names (offset 0.254))\n'
-    out += f'{sp}  (property "Reference" {q(sym["name"][0])} (at 0 2 0) {FONT})\n'
-    out += f'{sp}  (property "Value" {q(sym["name"])} (at 0 -2 0) {FONT})\n'
-    out += f'{sp}  (symbol "{sym["name"]}_0_1"\n'
+    parts = [
+        f'{sp}(symbol {q(sym["name"])}\n{sp}  (pin_names (offset 0.254))\n'
+        f'{sp}  (property "Reference" {q(sym["name"][0])} (at 0 2 0) {FONT})\n'
+        f'{sp}  (property "Value" {q(sym["name"])} (at 0 -2 0) {FONT})\n'
+        f'{sp}  (symbol "{sym["name"]}_0_1"\n'
+    ]
     for p in sym['pins']:
         x, y = num(p['at'][0]), num(p['at'][1])
-        out += f'{sp}    (pin {p["typ"]} line (at {x} {y} 0) (length 2.54) (name {q(p["name"])} {FONT}) (number {q(p["num"])} {FONT}))\n'
-    out += f'{sp}  )\n{sp})\n'
-    return out
+        parts.append(f'{sp}    (pin {p["typ"]} line (at {x} {y} 0) (length 2.54) (name {q(p["name"])} {FONT}) (number {q(p["num"])} {FONT}))\n')
+    parts.append(f'{sp}  )\n{sp})\n')
+    return ''.join(parts)
 
 # lib_id selection 
-def choose_lib_id(ref: str, val: str, pins: str, cell: str,
-                  sys_root: Path, conv_root: Optional[Path],
-                  combined_path: Optional[Path], converted_lib: str) -> str:
-    """Prefer converted symbol by CellName, then by Value; else stock mapping."""
+@lru_cache(maxsize=4096)   # parts repeat the same (prefix, value, pins, cell)
+def _lib_id_for(prefix: str, val: str, pins: str, cell: str,
+                conv_root: Optional[Path], combined_path: Optional[Path],
+                converted_lib: str) -> Tuple[str, str]:
+    """(lib_id, how it was chosen) for one part kind; see choose_lib_id."""
     # 1) Exact cell match in converted set
     cell_clean = _clean_name(cell)
     if cell_clean and _converted_has_symbol(conv_root, combined_path, cell_clean):
-        print(f"[map] {ref}: using converted by CellName → {converted_lib}:{cell_clean}")
-        return f"{converted_lib}:{cell_clean}"
+        return f"{converted_lib}:{cell_clean}", "converted by CellName"
 
     # 2) Try by PartValue (common for vendor PNs etc.)
     val_clean = _clean_name(val)
     if val_clean and _converted_has_symbol(conv_root, combined_path, val_clean):
-        print(f"[map] {ref}: using converted by Value → {converted_lib}:{val_clean}")
-        return f"{converted_lib}:{val_clean}"
+        return f"{converted_lib}:{val_clean}", "converted by Value"
 
     # 3) Stock mapping fallback
-    key = (ref[0], pins)
-    lid = LIB_ID.get(key) or LIB_ID.get(ref[0]) or f"Device:{ref[0]}"
-    print(f"[map] {ref}: using stock mapping → {lid}")
+    key = (prefix[0], pins)
+    lid = LIB_ID.get(key) or LIB_ID.get(prefix[0]) or f"Device:{prefix[0]}"
+    return lid, "stock mapping"
+
+def choose_lib_id(ref: str, val: str, pins: str, cell: str,
+                  sys_root: Path, conv_root: Optional[Path],
+                  combined_path: Optional[Path], converted_lib: str) -> str:
+    """Prefer converted symbol by CellName, then by Value; else stock mapping."""
+    lid, how = _lib_id_for(ref[:1], val, pins, cell, conv_root, combined_path, converted_lib)
+    print(f"[map] {ref}: using {how} → {lid}")
     return lid
 
+@lru_cache(maxsize=512)
 def _normalize_power_candidate(s: str) -> str:
     """Normalize OrCAD power names like VCC_ARROW, etc., to common rail tags."""
     if not s:
@@ -451,7 +675,7 @@ def _normalize_power_candidate(s: str) -> str:
     c = _clean_name(s)
     u = c.upper()
     # strip common suffixes from CAPSYM names
-    u = re.sub(r'_(ARROW|POWER|SIGNAL|BAR|UP|DOWN)$', '', u)
+    u = POWER_SUFFIX_RE.sub('', u)
     if u.startswith("VCC"): return "VCC"
     if u.startswith("VDD"): return "VDD"
     if u.startswith("VSS"): return "VSS"
@@ -515,7 +739,8 @@ def choose_power_preferring_converted(symbol_name: str, name: str,
 
 # write schematic
 def write_schematic(rdr: OrCadReader, outfile: Path, sys_root: Path,
-                    conv_root: Optional[Path], combined_path: Optional[Path], converted_lib: str):
+                    conv_root: Optional[Path], combined_path: Optional[Path], converted_lib: str,
+                    jobs: int = 1):
     comps = rdr.components()
     wires, juncs = rdr.nets()
     pwr_syms = rdr.power_globals()
@@ -532,7 +757,7 @@ def write_schematic(rdr: OrCadReader, outfile: Path, sys_root: Path,
             p['symbol'], p['name'], conv_root, combined_path, converted_lib
         )
         p['lib'] = lib_id
-        p['props'] = OrderedDict(Reference=f"#PWR{pwr_ref_base + i}", Value=val_txt)
+        p['props'] = {'Reference': f"#PWR{pwr_ref_base + i}", 'Value': val_txt}
 
     # embed used symbol defs (components + power symbols)
     placed_ids = {c['lib'] for c in comps} | {p['lib'] for p in pwr_syms}
@@ -541,43 +766,58 @@ def write_schematic(rdr: OrCadReader, outfile: Path, sys_root: Path,
         if ":" in lid:
             collect(sys_root, conv_root, combined_path, converted_lib, lid, placed_ids, done, embedded)
 
-    with outfile.open('w', encoding='utf-8') as fp:
-        fp.write('(kicad_sch\n'
-                 '  (version 20250114)\n'
-                 '  (generator "orcad2kicad")\n'
-                 f'  (uuid {q(uid())})\n'
-                 '  (paper "A4")\n'
-                 '  (title_block (title "") (date "") (rev ""))\n'
-                 '  (lib_symbols\n')
-        for blk in embedded:
-            fp.write('    ' + blk.replace('\n', '\n    ').rstrip() + '\n')
-
-        # Add tiny fallbacks for any still-missing symbol libs
-        unresolved = [lid for lid in placed_ids if lid not in _symbol_blocks]
-        for lid in unresolved:
-            fbname = "Fallback_" + lid.split(":")[-1]
-            print(f"[warn] No symbol found for {lid}; embedding {fbname}")
-            fp.write(fallback_block(
-                {"name": fbname, "pins": [
-                    {"typ": "passive", "at": (-2.54, 0), "name": "1", "num": "1"},
-                    {"typ": "passive", "at": ( 2.54, 0), "name": "2", "num": "2"},
-                ]}, '    '))
-        fp.write('  )\n')
-
-        # Place normal components
-        for c in comps:
-            fp.write(inst_block(c))
-
-        # Place power symbols
-        for p in pwr_syms:
-            fp.write(inst_block(p))
-
-        # Nets & junctions
-        for w in wires:
-            fp.write(f"  (wire (pts {xy(w[0])} {xy(w[1])}) (stroke (width 0)))\n")
-        for j in juncs:
-            fp.write(f"  (junction (at {num(j[0])} {num(j[1])}) (diameter 0))\n")
-        fp.write(')\n')
+    # header and lib_symbols are small; build them up front
+    parts: List[str] = [
+        '(kicad_sch\n'
+        '  (version 20250114)\n'
+        '  (generator "orcad2kicad")\n'
+        f'  (uuid {q(uid())})\n'
+        '  (paper "A4")\n'
+        '  (title_block (title "") (date "") (rev ""))\n'
+        '  (lib_symbols\n'
+    ]
+    for blk in embedded:
+        parts.append('    ' + blk.replace('\n', '\n    ').rstrip() + '\n')
+
+    # Add tiny fallbacks for any still-missing symbol libs
+    unresolved = [lid for lid in placed_ids if lid not in _symbol_blocks]
+    for lid in unresolved:
+        fbname = "Fallback_" + lid.split(":")[-1]
+        print(f"[warn] No symbol found for {lid}; embedding {fbname}")
+        parts.append(fallback_block(
+            {"name": fbname, "pins": [
+                {"typ": "passive", "at": (-2.54, 0), "name": "1", "num": "1"},
+                {"typ": "passive", "at": ( 2.54, 0), "name": "2", "num": "2"},
+            ]}, '    '))
+    parts.append('  )\n')
+
+    # instances, wires and junctions are streamed: rendered as the buffered
+    # writer asks for them instead of held in memory all at once
+    if jobs == 1:
+        insts = chain((inst_block(c) for c in comps),       # normal components
+                      (inst_block(p) for p in pwr_syms))    # power symbols
+    else:
+        insts = render_instances(comps + pwr_syms, jobs)
+    chunks = chain(
+        parts,
+        insts,
+        (f"  (wire (pts {xy(a)} {xy(b)}) (stroke (width 0)))\n" for a, b in wires),
+        (f"  (junction (at {num(x)} {num(y)}) (diameter 0))\n" for x, y in juncs),
+        (')\n',),
+    )
+    # written next to the target and moved into place, so a failure
+    # never leaves a truncated schematic behind
+    tmp = outfile.with_name(outfile.name + '.tmp')
+    try:
+        with tmp.open('w', encoding='utf-8', buffering=1 << 20) as fp:
+            fp.writelines(chunks)
+        os.replace(tmp, outfile)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+        raise
 
 
 def main():
@@ -588,6 +828,9 @@ def main():
     ap.add_argument('--converted-dir', default=None, help='Directory with converted *.kicad_sym (per-file and/or combined)')
     ap.add_argument('--converted-lib-file', default=None, help='Explicit combined *.kicad_sym file (e.g., converted_sch.kicad_sym)')
     ap.add_argument('--converted-lib', default='converted', help='Library name to use for converted symbols (lib_id prefix)')
+    ap.add_argument('--jobs', type=int, default=1,
+                    help=f'worker processes for rendering placements (0 = CPU count; '
+                         f'used from {POOL_MIN_INSTANCES} placements up)')
     args = ap.parse_args()
 
     xin = Path(args.xml)
@@ -606,7 +849,8 @@ def main():
     if args.converted_dir and conv_root and not conv_root.is_dir():
         sys.exit(f'[error] Converted directory not found: {conv_root}')
 
-    write_schematic(OrCadReader(xin), xout, sys_root, conv_root, combined_path, args.converted_lib)
+    write_schematic(OrCadReader(xin), xout, sys_root, conv_root, combined_path, args.converted_lib,
+                    jobs=args.jobs)
     print(f'✓ Wrote {xout}')
 
 if __name__ == '__main__':
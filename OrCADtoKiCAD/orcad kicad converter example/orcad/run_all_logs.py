@@ -5,6 +5,9 @@ into a SINGLE KiCad symbol library.
 Flow:
   • Recursively find all *.log files under each input directory.
   • For each log, call convert_log.py (WITHOUT --lib) so it emits one-symbol .kicad_sym.
+    A script that offers convert() (convert_log.py does) is imported and run
+    in-process, keeping the one-symbol libraries in memory; --isolate forces
+    the subprocess.
   • Merge all (symbol "...") blocks into one output library file.
   • Optionally keep the one-symbol files after merging.
 
@@ -18,11 +21,17 @@ Examples:
 """
 
 import argparse
+import importlib.util
+import re
 import subprocess
 import sys
+import traceback
 from pathlib import Path
 from typing import Dict, List, Optional, Set
-from collections import OrderedDict
+
+
+# the merged library is rewritten after this many converted logs (and at the end)
+CHECKPOINT_EVERY = 50
 
 
 def find_olb_root(path: Path) -> Optional[Path]:
@@ -58,22 +67,68 @@ def run_convert(cmd: List[str], workdir: Path) -> Set[Path]:
     return set(workdir.glob("*.kicad_sym")) - before
 
 
+# '(symbol "' is tried first so it wins over the bare '(' at the same offset
+SYMBOL_TOKEN_RE = re.compile(r'\(symbol "|[()]')
+PAREN_RE = re.compile(r'[()]')
+
+
+def load_converter(script: Path):
+    """Import *script* as a module if it offers convert()/library_text(); else None."""
+    spec = importlib.util.spec_from_file_location(script.stem, script)
+    if spec is None or spec.loader is None:
+        return None
+    mod = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(mod)
+    except Exception:
+        return None
+    if callable(getattr(mod, "convert", None)) and callable(getattr(mod, "library_text", None)):
+        return mod
+    return None
+
+
+def convert_inline(conv, log_path: Path, scale: Optional[float]) -> Dict[Path, str]:
+    """
+    Run conv.convert() in this process.
+    Returns {one-symbol .kicad_sym path: text}: the files the subprocess would
+    have written next to the log, without touching the disk.
+    """
+    kw = {} if scale is None else {"scale": scale}
+    try:
+        built = conv.convert(str(log_path), **kw)
+    except Exception:
+        traceback.print_exc()
+        sys.exit(f"‼️  {Path(conv.__file__).name} failed on {log_path}")
+    if not built:
+        print("no drawable symbol – skipped")
+        return {}
+    base = log_path.with_suffix("")
+    # same names as the script's own output; a later duplicate replaces the earlier
+    return {base.with_name(f"{safe}.kicad_sym"): conv.library_text([block])
+            for block, safe in built}
+
+
 def parse_symbol_blocks(txt: str) -> Dict[str, str]:
     """
     Extract top-level (symbol "Name" ...) blocks from a .kicad_sym text.
-    Returns OrderedDict{name -> full_block_text}.
+    Returns {name -> full_block_text} in file order.
     """
-    out: "OrderedDict[str, str]" = OrderedDict()
+    out: Dict[str, str] = {}
 
     # we’re going to walk the whole file once, tracking depth and grabbing
     # top-level (symbol "...") blocks that sit under the (kicad_symbol_lib ...) root.
+    # Only parens and symbol starts are visited; the regex skips everything else.
     depth = 0
-    i, n = 0, len(txt)
-
-    while i < n:
-        if txt.startswith('(symbol "', i) and depth == 1:
+    pos = 0
+
+    while True:
+        m = SYMBOL_TOKEN_RE.search(txt, pos)
+        if m is None:
+            break
+        i = m.start()
+        if depth == 1 and m.end() - i > 1:
             # read name
-            j = i + len('(symbol "')
+            j = m.end()
             k = txt.find('"', j)
             if k == -1:
                 break
@@ -81,35 +136,26 @@ def parse_symbol_blocks(txt: str) -> Dict[str, str]:
 
             # capture balanced block
             d = 0
-            start = i
-            while i < n:
-                ch = txt[i]
-                if ch == '(':
-                    d += 1
-                elif ch == ')':
-                    d -= 1
-                    if d == 0:
-                        end = i + 1
-                        out[name] = txt[start:end]
-                        i = end
-                        break
-                i += 1
+            for p in PAREN_RE.finditer(txt, i):
+                d += 1 if p.group() == '(' else -1
+                if d == 0:
+                    out[name] = txt[i:p.end()]
+                    pos = p.end()
+                    break
+            else:
+                break   # unbalanced to the end of the text
             continue
 
-        ch = txt[i]
-        if ch == '(':
-            depth += 1
-        elif ch == ')':
-            depth -= 1
-        i += 1
+        depth += 1 if txt[i] == '(' else -1
+        pos = i + 1
 
     return out
 
 
-def read_existing_lib_symbols(path: Path) -> "OrderedDict[str, str]":
+def read_existing_lib_symbols(path: Path) -> Dict[str, str]:
     """Return {symbol_name: block} from an existing .kicad_sym (if any)."""
     if not path.exists():
-        return OrderedDict()
+        return {}
     return parse_symbol_blocks(path.read_text(encoding="utf-8"))
 
 
@@ -142,6 +188,8 @@ def main() -> None:
                     help="Explicit output library path (*.kicad_sym). Overrides --out-dir.")
     pa.add_argument("--keep-single", action="store_true",
                     help="Keep the per-symbol .kicad_sym files (default: delete after merge)")
+    pa.add_argument("--isolate", action="store_true",
+                    help="Always run the convert script as a subprocess, even if it can be imported")
     args = pa.parse_args()
 
     # Gather all *.log files from all input directories
@@ -186,52 +234,74 @@ def main() -> None:
     if not convert_py.exists():
         sys.exit(f" convert script not found: {convert_py}")
 
+    # In-process when the script allows it: no interpreter launch and no
+    # write/read/delete round-trip of the one-symbol files per log
+    conv = None if args.isolate else load_converter(convert_py)
+
     # Load existing library (if any) so we can append/override
     lib_map = read_existing_lib_symbols(out_lib)
     total_added = 0
     converted_logs = skipped_logs = 0
 
     # Process each log
-    for log_path in all_logs:
-        print("→", log_path)
-        cmd = ["python3", str(convert_py), str(log_path)]
-        if args.scale is not None:
-            cmd += ["--scale", str(args.scale)]
-
-        new_syms = run_convert(cmd, workdir=log_path.parent)
-        if not new_syms:
-            skipped_logs += 1
-            continue
-
-        # Merge produced one-symbol libraries
-        for sym_file in sorted(new_syms):
-            try:
-                text = sym_file.read_text(encoding="utf-8")
-            except Exception as e:
-                print(f"   [warn] could not read {sym_file.name}: {e}", file=sys.stderr)
+    unsaved = 0  # logs merged since the library was last written
+    try:
+        for log_path in all_logs:
+            print("→", log_path)
+            if conv is not None:
+                new_syms: Dict[Path, Optional[str]] = convert_inline(conv, log_path, args.scale)
+            else:
+                cmd = ["python3", str(convert_py), str(log_path)]
+                if args.scale is not None:
+                    cmd += ["--scale", str(args.scale)]
+                new_syms = dict.fromkeys(run_convert(cmd, workdir=log_path.parent))
+            if not new_syms:
+                skipped_logs += 1
                 continue
 
-            blocks = parse_symbol_blocks(text)
-            if not blocks:
-                print(f"   [warn] {sym_file.name} contains no (symbol ...) blocks", file=sys.stderr)
-                continue
-
-            for name, blk in blocks.items():
-                old = "(overwrite)" if name in lib_map else "(new)"
-                lib_map[name] = blk
-                print(f"   + {name} {old}")
-                total_added += 1
-
-            if not args.keep_single:
-                try:
-                    sym_file.unlink()
-                except Exception as e:
-                    print(f"   [warn] could not delete {sym_file.name}: {e}", file=sys.stderr)
-
-        converted_logs += 1
-
-        # write incrementally so you can interrupt safely
-        write_library(list(lib_map.values()), out_lib, generator="run_all_logs")
+            # Merge produced one-symbol libraries (text is None: read it from disk)
+            for sym_file in sorted(new_syms):
+                text = new_syms[sym_file]
+                if text is None:
+                    try:
+                        text = sym_file.read_text(encoding="utf-8")
+                    except Exception as e:
+                        print(f"   [warn] could not read {sym_file.name}: {e}", file=sys.stderr)
+                        continue
+
+                blocks = parse_symbol_blocks(text)
+                if not blocks:
+                    print(f"   [warn] {sym_file.name} contains no (symbol ...) blocks", file=sys.stderr)
+                    continue
+
+                for name, blk in blocks.items():
+                    old = "(overwrite)" if name in lib_map else "(new)"
+                    lib_map[name] = blk
+                    print(f"   + {name} {old}")
+                    total_added += 1
+
+                if conv is not None:
+                    if args.keep_single:
+                        sym_file.write_text(text, encoding="utf-8")
+                        print("   Wrote", sym_file)
+                elif not args.keep_single:
+                    try:
+                        sym_file.unlink()
+                    except Exception as e:
+                        print(f"   [warn] could not delete {sym_file.name}: {e}", file=sys.stderr)
+
+            converted_logs += 1
+            unsaved += 1
+
+            # checkpoint now and then so an interrupted run keeps most of its work
+            if unsaved == CHECKPOINT_EVERY:
+                write_library(list(lib_map.values()), out_lib, generator="run_all_logs")
+                unsaved = 0
+    finally:
+        # final write; also runs when a convert step exits or on Ctrl-C,
+        # so logs merged since the last checkpoint are not lost
+        if unsaved:
+            write_library(list(lib_map.values()), out_lib, generator="run_all_logs")
 
     print(
         f"\n Finished – {total_added} symbol definition(s) in {out_lib} "
@@ -4,45 +4,81 @@ wiregen.py – Convert OrCAD XML to KiCad 9 schematic + parts metadata (with wir
 """
 
 import argparse, sys, json
+from functools import lru_cache
 import xml.etree.ElementTree as ET
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 
 MIL10 = 0.254  # OrCAD unit to mm
-num = lambda x: ("%f" % x).rstrip("0").rstrip(".")
-xy = lambda p: f"(xy {num(p[0])} {num(p[1])})"
-snap = lambda v: round(v, 3)
+
+# cached num/xy: copy of the ones in orcad2kicad_sch.py (see there for the zero handling)
+@lru_cache(maxsize=4096)
+def _num(x: float) -> str:
+    return ("%f" % x).rstrip("0").rstrip(".")
+
+def num(x: float) -> str:
+    return _num(x) if x else ("%f" % x).rstrip("0").rstrip(".")
+
+@lru_cache(maxsize=16384)
+def _xy(p: Tuple[float, float]) -> str:
+    return f"(xy {num(p[0])} {num(p[1])})"
+
+def xy(p: Tuple[float, float]) -> str:
+    return _xy(p) if p[0] and p[1] else f"(xy {num(p[0])} {num(p[1])})"
+
+# OrCAD units to mm, rounded onto the 0.001 grid
 mm = lambda v: round(float(v) * MIL10, 3) if v not in (None, "") else 0.0
 
 class OrCadReader:
     def __init__(self, xml_path: Path):
-        self.root = ET.parse(str(xml_path)).getroot()
-        self.strip_ns(self.root)
-
-    def strip_ns(self, elem):
-        for el in elem.iter():
-            if '}' in el.tag:
-                el.tag = el.tag.split('}', 1)[1]
+        # One streaming pass: namespaces are stripped as elements open and every
+        # element is indexed by tag in document order, so later lookups read a
+        # bucket instead of re-walking the tree with './/'.
+        self.by_tag: Dict[str, List] = {}
+        it = ET.iterparse(str(xml_path), events=('start', 'end'))
+        for ev, el in it:
+            if ev == 'end':
+                # drop indentation-only text as it completes (the tree is kept
+                # for extract_part_types, and nothing here reads text)
+                if el.text is not None and not el.text.strip():
+                    el.text = None
+                for ch in el:
+                    if ch.tail is not None and not ch.tail.strip():
+                        ch.tail = None
+                continue
+            tag = el.tag
+            if '}' in tag:
+                tag = el.tag = tag.split('}', 1)[1]
+            self.by_tag.setdefault(tag, []).append(el)
+        self.root = it.root
+        del self.by_tag[self.root.tag][0]   # './/' never matches the root itself
 
     def nets(self):
         wires, juncs = [], []
-        for w in self.root.findall('.//WireScalar/Defn'):
-            a = (snap(mm(w.get('startX'))), snap(mm(w.get('startY'))))
-            b = (snap(mm(w.get('endX'))), snap(mm(w.get('endY'))))
-            wires.append((a, b))
-        for j in self.root.findall('.//Junction/Defn'):
-            juncs.append((snap(mm(j.get('locX'))), snap(mm(j.get('locY')))))
+        for ws in self.by_tag.get('WireScalar', ()):
+            for w in ws:
+                if w.tag != 'Defn':
+                    continue
+                a = (mm(w.get('startX')), mm(w.get('startY')))
+                b = (mm(w.get('endX')), mm(w.get('endY')))
+                wires.append((a, b))
+        for jn in self.by_tag.get('Junction', ()):
+            for j in jn:
+                if j.tag == 'Defn':
+                    juncs.append((mm(j.get('locX')), mm(j.get('locY'))))
         return wires, juncs
 
 
-
-def build_pkg_map(xml_root):
+def build_pkg_map(xml_root, by_tag: Optional[Dict[str, List]] = None):
     """
     Return {pkgName: {"cellName": str, "pinCount": int}}
     by scanning the <Cache>/<Package> definitions.
+    by_tag: OrCadReader.by_tag, to skip the './/Package' descent.
     """
     packages = {}
-    for pkg in xml_root.findall('.//Package'):
+    pkgs = by_tag.get('Package', ()) if by_tag is not None else xml_root.findall('.//Package')
+    for pkg in pkgs:
         d = pkg.find('Defn')
         if d is None:
             continue
@@ -50,26 +86,28 @@ def build_pkg_map(xml_root):
         cell = ''
         pins = 0
 
-        lp_defn = pkg.find('.//LibPart/Defn')
+        # C-level iter(tag) instead of ElementPath; same matches as
+        # find('.//LibPart/Defn') and len(findall('.//PhysicalPart/PinNumber'))
+        lp_defn = next((ch for lp in pkg.iter('LibPart') for ch in lp if ch.tag == 'Defn'), None)
         if lp_defn is not None:
             cell = lp_defn.get('CellName', '')
 
-        pin_elems = pkg.findall('.//PhysicalPart/PinNumber')
-        pins = len(pin_elems)
+        pins = sum(ch.tag == 'PinNumber' for pp in pkg.iter('PhysicalPart') for ch in pp)
 
         packages[name] = {"cellName": cell, "pinCount": pins}
 
     return packages
 
 
-def extract_part_types(xml_root) -> dict:
+def extract_part_types(xml_root, by_tag: Optional[Dict[str, List]] = None) -> dict:
     """
     Return {RefDes: metadata…} with location, rotation, package info, etc.
     """
-    pkg_map = build_pkg_map(xml_root)
+    pkg_map = build_pkg_map(xml_root, by_tag)
     part_info = {}
 
-    for pi in xml_root.findall('.//PartInst'):
+    pis = by_tag.get('PartInst', ()) if by_tag is not None else xml_root.findall('.//PartInst')
+    for pi in pis:
         ref_el  = pi.find('Reference/Defn')
         defn_el = pi.find('Defn')
 
@@ -103,24 +141,23 @@ def extract_part_types(xml_root) -> dict:
 
 
 def write_part_types_json(part_data: dict, output_path: Path):
-    with output_path.open("w", encoding="utf-8") as f:
-        json.dump(part_data, f, indent=2)
+    # json.dumps + one write: json.dump issues a write() per token
+    output_path.write_text(json.dumps(part_data, indent=2), encoding="utf-8")
     print(f"✓ Wrote {output_path}")
 
 # --- KiCad Net + Junction Writer ---
 def write_wiring_only(rdr: OrCadReader, outfile: Path):
     wires, juncs = rdr.nets()
-    with outfile.open('w', encoding='utf-8') as fp:
-        fp.write('(kicad_sch\n'
-                 '  (version 20250114)\n'
-                 '  (generator "orcad2kicad_wires_only")\n'
-                 '  (paper "A4")\n'
-                 '  (title_block (title "") (date "") (rev ""))\n')
-        for w in wires:
-            fp.write(f"  (wire (pts {xy(w[0])} {xy(w[1])}) (stroke (width 0)))\n")
-        for j in juncs:
-            fp.write(f"  (junction (at {num(j[0])} {num(j[1])}) (diameter 0))\n")
-        fp.write(')\n')
+    # collect every record, then write the file in one go
+    parts = ['(kicad_sch\n'
+             '  (version 20250114)\n'
+             '  (generator "orcad2kicad_wires_only")\n'
+             '  (paper "A4")\n'
+             '  (title_block (title "") (date "") (rev ""))\n']
+    parts.extend(f"  (wire (pts {xy(w[0])} {xy(w[1])}) (stroke (width 0)))\n" for w in wires)
+    parts.extend(f"  (junction (at {num(j[0])} {num(j[1])}) (diameter 0))\n" for j in juncs)
+    parts.append(')\n')
+    outfile.write_text(''.join(parts), encoding='utf-8')
 
 # --- Entry Point ---
 def main():
@@ -137,7 +174,7 @@ def main():
         sys.exit(f'[error] {xin} not found')
 
     reader = OrCadReader(xin)
-    parts = extract_part_types(reader.root)
+    parts = extract_part_types(reader.root, reader.by_tag)
     write_part_types_json(parts, jout)
     write_wiring_only(reader, xout)
     print(f'✓ Wrote {xout}')